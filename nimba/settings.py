@@ -29,6 +29,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Adresse publique du site (emails, préchauffage du cache)
+SITE_URL = 'http://127.0.0.1:8000'  # À remplacer par votre domaine en production
+
 
 # Application definition
 
@@ -39,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
     'nimbaApp',
 ]
 
@@ -48,6 +52,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'nimbaApp.profilage.ProfilageMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -64,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'nimbaApp.context_processors.assets',
             ],
         },
     },
@@ -99,6 +105,28 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Cache partagé par tous les workers et par les commandes (cron) : cache des
+# pages, verrous anti-rafale, invalidations et limitation de débit en
+# dépendent. Un cache en mémoire du processus (LocMemCache) ne convient qu'au
+# développement avec un seul processus (avertissement nimbaApp.W001).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    }
+}
+
+# Pour le développement sans Redis :
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+#     }
+# }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -136,6 +164,17 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Noms hachés (cache navigateur d'un an) et variantes précompressées .gz/.br
+STORAGES = {
+    # Fichiers envoyés nommés par leur contenu (dédoublonnés, cache d'un an possible)
+    'default': {
+        'BACKEND': 'nimbaApp.storage.StockageMediaContenu',
+    },
+    'staticfiles': {
+        'BACKEND': 'nimbaApp.storage.StockageStatiqueCompresse',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -143,6 +182,19 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 
+# =======================
+# SESSIONS ET MESSAGES
+# =======================
+
+# Messages dans un cookie signé : aucun accès à la session pour les afficher
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+# Sessions anonymes en cache seulement, sessions connectées aussi en base (voir nimbaApp/sessions.py)
+SESSION_ENGINE = 'nimbaApp.sessions'
+# N'enregistrer une session que si elle a été modifiée (valeur par défaut, rendue explicite)
+SESSION_SAVE_EVERY_REQUEST = False
+
+
+
 # =======================
 # EMAIL CONFIGURATION
 # =======================
@@ -169,3 +221,66 @@ EMAIL_TIMEOUT = 30
 
 # Pour le développement, vous pouvez utiliser ce backend pour voir les emails dans la console
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+
+# =======================
+# NEWSLETTER
+# =======================
+
+# Regrouper les nouveaux articles dans un envoi périodique (commande envoyer_newsletter)
+# au lieu d'un envoi à toute la liste à chaque publication
+NEWSLETTER_MODE_DIGEST = True
+# Délai minimal, en heures, entre deux envois pour les abonnés de fréquence « régulière »
+NEWSLETTER_FENETRE_DIGEST = 3
+# Nombre de destinataires (en copie cachée) par email
+NEWSLETTER_TAILLE_LOT = 50
+
+
+
+# =======================
+# PRE-RENDU STATIQUE
+# =======================
+
+# Pages d'articles rendues sur disque à la publication, servies directement par nginx
+PRERENDU_ACTIF = True
+PRERENDU_ROOT = BASE_DIR / 'prerendu'
+
+
+
+# =======================
+# PROFILAGE
+# =======================
+
+# Profilage à la demande des requêtes du staff (jeton délivré sur le dashboard)
+PROFILAGE_ACTIF = True
+# Durée de validité d'un jeton de profilage, en secondes
+PROFILAGE_DUREE_JETON = 60 * 60
+# Nombre de profils conservés (les plus anciens sont écartés) et durée de conservation
+PROFILAGE_TAILLE_TAMPON = 20
+PROFILAGE_DUREE_CONSERVATION = 60 * 60 * 24
+# Dossier des profils, commun aux workers du serveur
+PROFILAGE_ROOT = BASE_DIR / 'profils'
+
+
+
+# =======================
+# LIMITATION DE DEBIT
+# =======================
+
+# Seau de jetons par point d'accès public et par adresse IP (voir nimbaApp/limitation.py) :
+# `capacite` requêtes d'affilée, puis `par_minute` requêtes par minute
+LIMITATION_DEBIT_ACTIVE = True
+LIMITATION_DEBIT = {
+    'inscription_newsletter': {'capacite': 5, 'par_minute': 2},
+    'clic_publicite': {'capacite': 20, 'par_minute': 10},
+    'vue_article': {'capacite': 30, 'par_minute': 20},
+}
+# 'cache' (cache Django : commun aux workers avec le cache Redis de CACHES) ou 'local'
+# (mémoire du processus : une limite par worker)
+LIMITATION_DEBIT_STOCKAGE = 'cache'
+# Nombre de proxys de confiance devant Django (nginx : 1) pour lire l'adresse dans X-Forwarded-For
+LIMITATION_DEBIT_NB_PROXYS = 0
+# Délai, en secondes, pendant lequel les clics répétés d'une adresse sur une publicité ne comptent qu'une fois
+DEDOUBLONNAGE_CLICS = 30
+# Délai, en secondes, pendant lequel les lectures répétées d'un article par une adresse ne comptent qu'une fois
+DEDOUBLONNAGE_VUES = 30 * 60
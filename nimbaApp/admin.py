@@ -1,43 +1,114 @@
 from django.contrib import admin
-from .models import Categorie, Article, Publicite, Newsletter
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .cache_utils import changer_version_listes, cle_cache_publicites
+from .compteurs import articles_modifies, etats_articles
+from .models import Categorie, Article, Publicite, Newsletter, ArticleNewsletter
+from .signals import articles_modifies_en_masse
+
+# En dessous de ce nombre de lignes, un COUNT(*) exact reste bon marché
+SEUIL_COMPTAGE_ESTIME = 10000
+
+
+def estimer_nombre_lignes(modele):
+    """Nombre de lignes d'une table d'après les statistiques de la base (None si indisponible)"""
+    table = modele._meta.db_table
+    with connection.cursor() as curseur:
+        if connection.vendor == 'mysql':
+            curseur.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", [table]
+            )
+        elif connection.vendor == 'postgresql':
+            curseur.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        ligne = curseur.fetchone()
+    return ligne[0] if ligne else None
+
+
+class PaginateurEstime(Paginator):
+    """
+    Paginateur des listes de l'admin : sans filtre ni recherche, le nombre
+    total est lu dans les statistiques de la table au lieu d'un COUNT(*)
+    qui la parcourt entièrement
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimation = estimer_nombre_lignes(self.object_list.model)
+            if estimation and estimation > SEUIL_COMPTAGE_ESTIME:
+                return estimation
+        return super().count
 
 
 @admin.register(Newsletter)
 class NewsletterAdmin(admin.ModelAdmin):
-    list_display = ('email', 'date_inscription', 'est_actif')
-    list_filter = ('est_actif', 'date_inscription')
-    search_fields = ('email',)
-    date_hierarchy = 'date_inscription'
-    readonly_fields = ('date_inscription',)
+    list_display = ('email', 'date_inscription', 'est_actif', 'frequence', 'dernier_envoi')
+    list_filter = ('est_actif', 'frequence', 'date_inscription')
+    # Recherche par début d'adresse : utilise l'index unique de la colonne email
+    search_fields = ('^email',)
+    readonly_fields = ('date_inscription', 'dernier_envoi')
+    paginator = PaginateurEstime
+    show_full_result_count = False
 
     actions = ['activer_abonnes', 'desactiver_abonnes']
 
     def activer_abonnes(self, request, queryset):
-        queryset.update(est_actif=True)
-        self.message_user(request, f"{queryset.count()} abonné(s) activé(s)")
+        nb = queryset.update(est_actif=True)
+        self.message_user(request, f"{nb} abonné(s) activé(s)")
 
     activer_abonnes.short_description = "Activer les abonnés sélectionnés"
 
     def desactiver_abonnes(self, request, queryset):
-        queryset.update(est_actif=False)
-        self.message_user(request, f"{queryset.count()} abonné(s) désactivé(s)")
+        nb = queryset.update(est_actif=False)
+        self.message_user(request, f"{nb} abonné(s) désactivé(s)")
 
     desactiver_abonnes.short_description = "Désactiver les abonnés sélectionnés"
 
 
+@admin.register(ArticleNewsletter)
+class ArticleNewsletterAdmin(admin.ModelAdmin):
+    list_display = ('article', 'date_ajout')
+    list_select_related = ('article',)
+    readonly_fields = ('date_ajout',)
+    raw_id_fields = ('article',)
+
+
 @admin.register(Categorie)
 class CategorieAdmin(admin.ModelAdmin):
-    list_display = ('get_nom_display', 'description', 'ordre')
+    list_display = ('get_nom_display', 'description', 'ordre', 'nb_articles_publies', 'total_vues',
+                    'date_dernier_article')
+    readonly_fields = ('nb_articles_publies', 'total_vues', 'dernier_article', 'date_dernier_article')
     search_fields = ('nom',)
 
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
-    list_display = ('titre', 'categorie', 'auteur', 'date_publication', 'est_publie', 'vues')
-    list_filter = ('categorie', 'est_publie', 'date_publication')
-    search_fields = ('titre', 'contenu')
-    date_hierarchy = 'date_publication'
+    list_display = ('titre', 'categorie', 'auteur', 'date_publication', 'est_publie', 'est_a_la_une', 'vues')
+    list_filter = ('categorie', 'est_publie', 'est_a_la_une', 'date_publication')
+    list_select_related = ('categorie', 'auteur')
+    # Recherche par début de titre (index sur titre) plutôt qu'un LIKE sur le contenu.
+    # Pas de date_hierarchy : ses liens demandent un parcours de toute la table,
+    # le filtre par date (périodes fixes) le remplace.
+    search_fields = ('^titre',)
+    autocomplete_fields = ('categorie', 'auteur')
     readonly_fields = ('vues', 'date_modification')
+    paginator = PaginateurEstime
+    show_full_result_count = False
+
+    actions = ['publier_articles', 'depublier_articles', 'mettre_a_la_une', 'retirer_de_la_une']
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # La liste n'affiche pas le contenu : inutile de le charger pour chaque ligne
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer('contenu')
+        return queryset
 
     fieldsets = (
         ('Informations principales', {
@@ -47,7 +118,7 @@ class ArticleAdmin(admin.ModelAdmin):
             'fields': ('contenu', 'image')
         }),
         ('Publication', {
-            'fields': ('est_publie', 'est_a_la_une', 'date_publication')
+            'fields': ('est_publie', 'est_a_la_une', 'date_publication', 'publication_programmee')
         }),
         ('Statistiques', {
             'fields': ('vues', 'date_modification'),
@@ -60,15 +131,75 @@ class ArticleAdmin(admin.ModelAdmin):
             obj.auteur = request.user
         super().save_model(request, obj, form, change)
 
+    def _modifier_en_masse(self, queryset, prerendre=True, **valeurs):
+        """Un seul UPDATE pour la sélection, puis invalidation et pré-rendu groupés"""
+        article_ids = list(queryset.values_list('id', flat=True))
+        with transaction.atomic():
+            etats_avant = etats_articles(article_ids)
+            nb = Article.objects.filter(id__in=article_ids).update(date_modification=timezone.now(), **valeurs)
+            articles_modifies(etats_avant, etats_articles(article_ids))
+        articles_modifies_en_masse(article_ids, prerendre=prerendre)
+        return nb
+
+    def publier_articles(self, request, queryset):
+        nb = self._modifier_en_masse(queryset, est_publie=True, publication_programmee=False)
+        self.message_user(request, f"{nb} article(s) publié(s)")
+
+    publier_articles.short_description = "Publier les articles sélectionnés"
+
+    def depublier_articles(self, request, queryset):
+        nb = self._modifier_en_masse(queryset, est_publie=False, publication_programmee=False)
+        self.message_user(request, f"{nb} article(s) dépublié(s)")
+
+    depublier_articles.short_description = "Dépublier les articles sélectionnés"
+
+    def mettre_a_la_une(self, request, queryset):
+        nb = self._modifier_en_masse(queryset, prerendre=False, est_a_la_une=True)
+        self.message_user(request, f"{nb} article(s) mis à la une")
+
+    mettre_a_la_une.short_description = "Mettre à la une les articles sélectionnés"
+
+    def retirer_de_la_une(self, request, queryset):
+        nb = self._modifier_en_masse(queryset, prerendre=False, est_a_la_une=False)
+        self.message_user(request, f"{nb} article(s) retiré(s) de la une")
+
+    retirer_de_la_une.short_description = "Retirer de la une les articles sélectionnés"
+
 
 @admin.register(Publicite)
 class PubliciteAdmin(admin.ModelAdmin):
-    list_display = ('titre', 'position', 'date_debut', 'date_fin', 'est_active', 'nombre_clics')
-    list_filter = ('position', 'est_active')
-    search_fields = ('titre', 'description')
-    date_hierarchy = 'date_debut'
+    list_display = ('titre', 'position', 'auteur', 'date_debut', 'date_fin', 'est_active', 'nombre_clics')
+    list_filter = ('position', 'est_active', 'date_debut')
+    list_select_related = ('auteur',)
+    search_fields = ('^titre',)
+    autocomplete_fields = ('auteur',)
+    paginator = PaginateurEstime
+    show_full_result_count = False
+
+    actions = ['activer_publicites', 'desactiver_publicites']
 
     def save_model(self, request, obj, form, change):
         if not obj.pk:
             obj.auteur = request.user
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+    def _modifier_en_masse(self, queryset, **valeurs):
+        """Un seul UPDATE pour la sélection, puis vidage du cache des emplacements"""
+        auteurs = set(queryset.values_list('auteur_id', flat=True))
+        nb = queryset.update(**valeurs)
+        cache.delete_many([cle_cache_publicites(position) for position, _ in Publicite.POSITION_CHOICES])
+        for auteur_id in auteurs:
+            changer_version_listes(auteur_id)
+        return nb
+
+    def activer_publicites(self, request, queryset):
+        nb = self._modifier_en_masse(queryset, est_active=True)
+        self.message_user(request, f"{nb} publicité(s) activée(s)")
+
+    activer_publicites.short_description = "Activer les publicités sélectionnées"
+
+    def desactiver_publicites(self, request, queryset):
+        nb = self._modifier_en_masse(queryset, est_active=False)
+        self.message_user(request, f"{nb} publicité(s) désactivée(s)")
+
+    desactiver_publicites.short_description = "Désactiver les publicités sélectionnées"
@@ -0,0 +1,216 @@
+"""
+API JSON en lecture seule (v1) pour l'application mobile et les partenaires.
+
+- pagination par curseur (keyset) sur (date_publication, id), sans OFFSET ;
+- champs à la demande avec ?champs=titre,image,... (le contenu n'est renvoyé
+  par défaut que sur le détail d'un article) ;
+- ETag / Last-Modified, compression gzip et mise en cache des réponses ;
+- une requête SQL par appel (hors vérification de version).
+"""
+import base64
+import binascii
+
+from django.db.models import Q
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, set_response_etag
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
+from .cache_utils import reponse_versionnee
+from .feeds import version_articles
+from .models import Article, Categorie
+from .views import DUREE_CACHE_PUBLICITES, NB_PUBLICITES_PAR_POSITION, donnees_emplacement
+
+# Taille de page par défaut et maximale de la liste des articles
+LIMITE_PAR_DEFAUT = 20
+LIMITE_MAX = 100
+
+# Durée pendant laquelle les clients peuvent réutiliser une réponse sans revalider
+MAX_AGE_API = 60
+
+# Durée de conservation côté serveur : le compteur de vues ne change pas la
+# version d'un article, il est donc rafraîchi au plus tard après ce délai
+DUREE_CACHE_API = 300
+
+# Champs exposés pour un article, avec les colonnes nécessaires pour les produire
+CHAMPS_ARTICLE = {
+    'id': ('id',),
+    'titre': ('titre',),
+    'sous_titre': ('sous_titre',),
+    'contenu': ('contenu',),
+    'image': ('image',),
+    'categorie': ('categorie__nom',),
+    'auteur': ('auteur__username', 'auteur__first_name', 'auteur__last_name'),
+    'date_publication': ('date_publication',),
+    'date_modification': ('date_modification',),
+    'est_a_la_une': ('est_a_la_une',),
+    'vues': ('vues',),
+    'url': ('id',),
+}
+CHAMPS_LISTE_PAR_DEFAUT = [champ for champ in CHAMPS_ARTICLE if champ != 'contenu']
+CHAMPS_DETAIL_PAR_DEFAUT = list(CHAMPS_ARTICLE)
+
+
+class ErreurApi(Exception):
+    """Paramètre invalide, renvoyé au client sous forme d'erreur 400"""
+
+
+def erreur(message, status=400):
+    return JsonResponse({'erreur': message}, status=status)
+
+
+def _champs_demandes(request, par_defaut):
+    """Liste des champs demandés via ?champs=, validée"""
+    parametre = request.GET.get('champs')
+    if not parametre:
+        return par_defaut
+    champs = [champ.strip() for champ in parametre.split(',') if champ.strip()]
+    inconnus = [champ for champ in champs if champ not in CHAMPS_ARTICLE]
+    if inconnus:
+        raise ErreurApi(f"Champ(s) inconnu(s) : {', '.join(inconnus)}")
+    return champs
+
+
+def _articles(champs):
+    """Queryset des articles publiés ne chargeant que les colonnes utiles"""
+    colonnes = {'id', 'date_publication'}
+    for champ in champs:
+        colonnes.update(CHAMPS_ARTICLE[champ])
+    articles = Article.objects.filter(est_publie=True)
+    if 'categorie' in champs:
+        articles = articles.select_related('categorie')
+    if 'auteur' in champs:
+        articles = articles.select_related('auteur')
+    return articles.only(*colonnes)
+
+
+def _serialiser_article(article, champs):
+    donnees = {}
+    for champ in champs:
+        if champ == 'image':
+            donnees['image'] = article.image.url if article.image else None
+        elif champ == 'categorie':
+            donnees['categorie'] = article.categorie.nom
+        elif champ == 'auteur':
+            donnees['auteur'] = article.auteur.get_full_name() or article.auteur.username
+        elif champ == 'url':
+            donnees['url'] = reverse('nimbaApp:article_detail', args=[article.id])
+        else:
+            donnees[champ] = getattr(article, champ)
+    return donnees
+
+
+def encoder_curseur(article):
+    brut = f"{article.date_publication.isoformat()}|{article.id}"
+    return base64.urlsafe_b64encode(brut.encode()).decode()
+
+
+def decoder_curseur(curseur):
+    """Renvoie (date_publication, id) du dernier article de la page précédente"""
+    try:
+        date_brute, article_id = base64.urlsafe_b64decode(curseur.encode()).decode().rsplit('|', 1)
+        date_publication = parse_datetime(date_brute)
+        if date_publication is None:
+            raise ValueError
+        return date_publication, int(article_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ErreurApi("Curseur invalide")
+
+
+def version_article(id):
+    """Version d'un article pour le cache et l'ETag du détail"""
+    date_modification = Article.objects.filter(id=id, est_publie=True).values_list(
+        'date_modification', flat=True
+    ).first()
+    return date_modification, 1 if date_modification else 0
+
+
+def version_liste_articles():
+    return version_articles()
+
+
+@gzip_page
+@require_GET
+@reponse_versionnee('api-articles', version_liste_articles, timeout=DUREE_CACHE_API, max_age=MAX_AGE_API,
+                    parametres=('categorie', 'a_la_une', 'limite', 'curseur', 'champs'))
+def liste_articles(request):
+    """GET /api/v1/articles/?categorie=&a_la_une=1&limite=&curseur=&champs="""
+    try:
+        champs = _champs_demandes(request, CHAMPS_LISTE_PAR_DEFAUT)
+        try:
+            limite = min(LIMITE_MAX, max(1, int(request.GET.get('limite', LIMITE_PAR_DEFAUT))))
+        except ValueError:
+            raise ErreurApi("Paramètre 'limite' invalide")
+
+        articles = _articles(champs)
+        if request.GET.get('categorie'):
+            articles = articles.filter(categorie__nom=request.GET['categorie'])
+        if request.GET.get('a_la_une') == '1':
+            articles = articles.filter(est_a_la_une=True)
+        if request.GET.get('curseur'):
+            date_publication, article_id = decoder_curseur(request.GET['curseur'])
+            articles = articles.filter(
+                Q(date_publication__lt=date_publication) |
+                Q(date_publication=date_publication, id__lt=article_id)
+            )
+    except ErreurApi as e:
+        return erreur(str(e))
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    page = list(articles.order_by('-date_publication', '-id')[:limite + 1])
+    suivant = encoder_curseur(page[limite - 1]) if len(page) > limite else None
+    return JsonResponse({
+        'resultats': [_serialiser_article(article, champs) for article in page[:limite]],
+        'suivant': suivant,
+    }, json_dumps_params={'ensure_ascii': False})
+
+
+@gzip_page
+@require_GET
+@reponse_versionnee('api-article', version_article, timeout=DUREE_CACHE_API, max_age=MAX_AGE_API,
+                    parametres=('champs',))
+def detail_article(request, id):
+    """GET /api/v1/articles/<id>/?champs="""
+    try:
+        champs = _champs_demandes(request, CHAMPS_DETAIL_PAR_DEFAUT)
+    except ErreurApi as e:
+        return erreur(str(e))
+
+    article = _articles(champs).filter(id=id).first()
+    if article is None:
+        return erreur("Article introuvable", status=404)
+    return JsonResponse(_serialiser_article(article, champs), json_dumps_params={'ensure_ascii': False})
+
+
+@gzip_page
+@require_GET
+def liste_categories(request):
+    """GET /api/v1/categories/ (quelques lignes : ETag calculé sur le contenu)"""
+    categories = [
+        {
+            'nom': categorie.nom,
+            'libelle': categorie.get_nom_display(),
+            'description': categorie.description,
+            'ordre': categorie.ordre,
+        }
+        for categorie in Categorie.objects.all()
+    ]
+    response = JsonResponse({'resultats': categories}, json_dumps_params={'ensure_ascii': False})
+    set_response_etag(response)
+    patch_cache_control(response, public=True, max_age=MAX_AGE_API)
+    return get_conditional_response(request, etag=response['ETag'], response=response)
+
+
+@gzip_page
+@require_GET
+def publicites_position(request, position):
+    """GET /api/v1/publicites/<position>/ : publicités actives d'un emplacement"""
+    if position not in NB_PUBLICITES_PAR_POSITION:
+        return erreur("Emplacement publicitaire inconnu", status=404)
+    response = JsonResponse({
+        'position': position,
+        'resultats': donnees_emplacement(position)['publicites'],
+    }, json_dumps_params={'ensure_ascii': False})
+    patch_cache_control(response, public=True, max_age=DUREE_CACHE_PUBLICITES)
+    return response
@@ -6,6 +6,6 @@ class NimbaappConfig(AppConfig):
     name = 'nimbaApp'
 
     def ready(self):
-        """Créer les catégories par défaut au démarrage de l'application"""
-        # Ne rien faire ici pour éviter les problèmes lors des migrations
-        pass
\ No newline at end of file
+        """Connecter les signaux et enregistrer les vérifications de l'application"""
+        # Ne pas créer de données ici pour éviter les problèmes lors des migrations
+        from . import checks, signals  # noqa: F401
\ No newline at end of file
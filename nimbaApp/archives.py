@@ -0,0 +1,110 @@
+"""
+Archives par date : pages par année et par mois, pour tout le site ou une rubrique.
+
+- la navigation (années, mois et nombre d'articles) vient de la table
+  ArchiveMois, tenue à jour à chaque publication ou dépublication (voir
+  compteurs.py) : une seule requête sur une petite table, sans GROUP BY sur
+  les articles ;
+- les articles d'une période sont paginés par curseur (keyset) sur
+  (date_publication, id), comme l'API, en lisant les index
+  (est_publie, date_publication) et (categorie, est_publie, date_publication) ;
+- les pages sont servies depuis le cache des pages (anonymes) ; la
+  publication, la dépublication ou la modification d'un article invalide les
+  premières pages de son mois et de son année, pour sa rubrique et pour tout
+  le site (voir compteurs.articles_modifies). Les pages suivantes et la
+  navigation des autres périodes se rafraîchissent après le délai du cache.
+"""
+from datetime import datetime
+
+from django.db.models import Q, Sum
+from django.http import Http404
+from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
+from .api import ErreurApi, decoder_curseur, encoder_curseur
+from .cache_utils import cle_page_archives
+from .models import ArchiveMois, Article, Categorie
+from .views import page_en_cache
+
+# Nombre d'articles par page d'archives
+NB_PAR_PAGE_ARCHIVES = 24
+
+NOMS_MOIS = ['janvier', 'février', 'mars', 'avril', 'mai', 'juin', 'juillet',
+             'août', 'septembre', 'octobre', 'novembre', 'décembre']
+
+
+def navigation_archives(categorie=None):
+    """Années (récentes d'abord) avec leur total et leurs mois : [(annee, total, [(mois, nom, nombre)])]"""
+    archives = ArchiveMois.objects.filter(nb_articles__gt=0)
+    if categorie is not None:
+        archives = archives.filter(categorie=categorie)
+    mois = archives.values('annee', 'mois').annotate(nb=Sum('nb_articles')).order_by('-annee', '-mois')
+
+    annees = []
+    for ligne in mois:
+        if not annees or annees[-1][0] != ligne['annee']:
+            annees.append((ligne['annee'], 0, []))
+        annee, total, liste = annees[-1]
+        liste.append((ligne['mois'], NOMS_MOIS[ligne['mois'] - 1], ligne['nb']))
+        annees[-1] = (annee, total + ligne['nb'], liste)
+    return annees
+
+
+def periode(annee, mois=None):
+    """Bornes [début, fin[ d'une année ou d'un mois, dans le fuseau du site"""
+    if mois is None:
+        debut, fin = datetime(annee, 1, 1), datetime(annee + 1, 1, 1)
+    elif mois == 12:
+        debut, fin = datetime(annee, 12, 1), datetime(annee + 1, 1, 1)
+    else:
+        debut, fin = datetime(annee, mois, 1), datetime(annee, mois + 1, 1)
+    return timezone.make_aware(debut), timezone.make_aware(fin)
+
+
+def archives(request, annee=None, mois=None, categorie=None):
+    """Archives de tout le site ou d'une rubrique, pour une année ou un mois"""
+    curseur = request.GET.get('apres', '')
+    cle = cle_page_archives(categorie, annee, mois, curseur)
+    return page_en_cache(request, cle, lambda: _archives(request, annee, mois, categorie, curseur))
+
+
+def _archives(request, annee, mois, categorie, curseur):
+    if annee is not None and not (1 <= annee < 9999 and (mois is None or 1 <= mois <= 12)):
+        raise Http404("Période invalide")
+    cat = get_object_or_404(Categorie, nom=categorie) if categorie else None
+
+    articles = []
+    suivant = None
+    if annee is not None:
+        debut, fin = periode(annee, mois)
+        selection = Article.objects.filter(est_publie=True, date_publication__gte=debut, date_publication__lt=fin)
+        if cat is not None:
+            selection = selection.filter(categorie=cat)
+        if curseur:
+            try:
+                date_publication, article_id = decoder_curseur(curseur)
+            except ErreurApi:
+                raise Http404("Curseur invalide")
+            selection = selection.filter(
+                Q(date_publication__lt=date_publication) |
+                Q(date_publication=date_publication, id__lt=article_id)
+            )
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        articles = list(
+            selection.defer('contenu').order_by('-date_publication', '-id')[:NB_PAR_PAGE_ARCHIVES + 1]
+        )
+        if len(articles) > NB_PAR_PAGE_ARCHIVES:
+            suivant = encoder_curseur(articles[NB_PAR_PAGE_ARCHIVES - 1])
+            articles = articles[:NB_PAR_PAGE_ARCHIVES]
+
+    context = {
+        'categorie': cat,
+        'annee': annee,
+        'mois': mois,
+        'nom_mois': NOMS_MOIS[mois - 1] if mois else None,
+        'articles': articles,
+        'suivant': suivant,
+        'est_suite': bool(curseur),
+        'navigation': navigation_archives(cat),
+        'categories': Categorie.objects.all(),
+    }
+    return render(request, 'archives.html', context)
@@ -0,0 +1,26 @@
+// Configuration de la construction de la feuille Tailwind (commande construire_assets).
+// Garder synchronisé avec nimbaApp/static/nimbaApp/js/tailwind-config.js.
+module.exports = {
+    content: [
+        './nimbaApp/templates/**/*.html',
+        './nimbaApp/static/nimbaApp/js/**/*.js',
+    ],
+    theme: {
+        extend: {
+            colors: {
+                'forest': {
+                    50: '#f0fdf4',
+                    100: '#dcfce7',
+                    200: '#bbf7d0',
+                    300: '#86efac',
+                    400: '#4ade80',
+                    500: '#22c55e',
+                    600: '#16a34a',
+                    700: '#15803d',
+                    800: '#166534',
+                    900: '#14532d',
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,268 @@
+import threading
+import time
+from calendar import timegm
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag, urlencode
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Durée de conservation par défaut des réponses versionnées (la version change
+# dès que le contenu change, le délai ne sert qu'à libérer la mémoire)
+DUREE_CACHE_REPONSES = 60 * 60 * 24
+
+# Backends dont le contenu n'est pas partagé entre les processus
+CACHES_NON_PARTAGES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_est_partage():
+    """Vrai si le cache par défaut est commun aux workers et aux commandes (Redis, Memcached...)"""
+    return settings.CACHES.get('default', {}).get('BACKEND') not in CACHES_NON_PARTAGES
+
+
+class CacheLocal:
+    """Cache LRU en mémoire du processus, de taille bornée, avec expiration"""
+
+    def __init__(self, taille_max):
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+        self.evictions = 0
+
+    def get(self, cle):
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                return None
+            valeur, expire_le = entree
+            if expire_le <= time.time():
+                del self._entrees[cle]
+                return None
+            self._entrees.move_to_end(cle)
+            return valeur
+
+    def set(self, cle, valeur, ttl):
+        with self._verrou:
+            self._entrees[cle] = (valeur, time.time() + ttl)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, cle):
+        with self._verrou:
+            self._entrees.pop(cle, None)
+
+
+class CacheDeuxNiveaux:
+    """
+    Cache à deux niveaux : LRU local au processus devant le cache Django partagé.
+
+    - une valeur est fraîche pendant `ttl`, puis reste servie, périmée, pendant
+      `delai_perime` le temps qu'un seul worker la recalcule (stale-while-revalidate) ;
+    - un verrou posé dans le cache partagé (cache.add) garantit qu'une seule
+      requête recalcule une clé donnée, les autres servent la valeur périmée ou,
+      s'il n'y en a pas encore, attendent brièvement le résultat ;
+    - `invalider` marque une valeur comme périmée sans la supprimer, pour
+      qu'une publication ne provoque pas de reconstruction simultanée partout.
+
+    Le verrou et les invalidations ne valent pour tous les workers (et pour les
+    commandes lancées par cron) que si le cache Django est partagé : Redis en
+    production (CACHES, vérification nimbaApp.W001). Le niveau local n'est gardé
+    que `ttl_local` secondes, délai maximal avant qu'un worker voie une invalidation.
+    """
+
+    def __init__(self, nom, ttl=300, delai_perime=3600, ttl_local=10, taille_locale=200,
+                 duree_verrou=30, attente_max=5):
+        self.nom = nom
+        self.ttl = ttl
+        self.delai_perime = delai_perime
+        self.ttl_local = ttl_local
+        self.duree_verrou = duree_verrou
+        self.attente_max = attente_max
+        self.local = CacheLocal(taille_locale)
+        self._compteurs = dict.fromkeys(
+            ('hits_local', 'hits_partages', 'perimes_servis', 'miss', 'recalculs', 'attentes'), 0
+        )
+        self._verrou_compteurs = threading.Lock()
+
+    def _cle(self, cle):
+        return f"nimba:{self.nom}:{cle}"
+
+    def _compter(self, compteur):
+        with self._verrou_compteurs:
+            self._compteurs[compteur] += 1
+
+    def statistiques(self):
+        """Compteurs du processus courant"""
+        with self._verrou_compteurs:
+            statistiques = dict(self._compteurs)
+        statistiques['evictions'] = self.local.evictions
+        return statistiques
+
+    def _recalculer(self, cle, calculer):
+        valeur = calculer()
+        entree = {'valeur': valeur, 'frais_jusqu_a': time.time() + self.ttl}
+        cache.set(self._cle(cle), entree, self.ttl + self.delai_perime)
+        self.local.set(cle, entree, self.ttl_local)
+        self._compter('recalculs')
+        return valeur
+
+    def obtenir(self, cle, calculer):
+        """Renvoie la valeur de `cle`, en la calculant avec `calculer()` si nécessaire"""
+        entree = self.local.get(cle)
+        if entree is not None and entree['frais_jusqu_a'] > time.time():
+            self._compter('hits_local')
+            return entree['valeur']
+
+        entree = cache.get(self._cle(cle))
+        if entree is not None and entree['frais_jusqu_a'] > time.time():
+            self.local.set(cle, entree, min(self.ttl_local, entree['frais_jusqu_a'] - time.time()))
+            self._compter('hits_partages')
+            return entree['valeur']
+
+        cle_verrou = self._cle(cle) + ':verrou'
+        if cache.add(cle_verrou, 1, self.duree_verrou):
+            try:
+                if entree is None:
+                    self._compter('miss')
+                return self._recalculer(cle, calculer)
+            finally:
+                cache.delete(cle_verrou)
+
+        if entree is not None:
+            # Un autre worker recalcule : servir la valeur périmée
+            self._compter('perimes_servis')
+            return entree['valeur']
+
+        # Première construction en cours ailleurs : attendre son résultat
+        self._compter('attentes')
+        limite = time.monotonic() + self.attente_max
+        while time.monotonic() < limite:
+            time.sleep(0.05)
+            entree = cache.get(self._cle(cle))
+            if entree is not None:
+                return entree['valeur']
+        self._compter('miss')
+        return self._recalculer(cle, calculer)
+
+    def invalider(self, *cles):
+        """Marque les clés comme périmées : servies encore le temps d'un recalcul"""
+        for cle in cles:
+            self.local.delete(cle)
+            entree = cache.get(self._cle(cle))
+            if entree is not None:
+                entree['frais_jusqu_a'] = 0
+                cache.set(self._cle(cle), entree, self.delai_perime)
+
+
+# Pages publiques (HTML complet) servies aux visiteurs anonymes
+cache_pages = CacheDeuxNiveaux('pages')
+
+
+def cle_page_archives(categorie=None, annee=None, mois=None, curseur=''):
+    """Clé d'une page d'archives dans le cache des pages (catégorie désignée par son nom)"""
+    return f"archives:{categorie or ''}:{annee or ''}:{mois or ''}:{curseur}"
+
+
+def cles_pages_archives(mois_touches):
+    """
+    Premières pages d'archives qui affichent des articles des mois donnés
+    [(nom de catégorie, année, mois)] : mois, année et accueil des archives, de
+    la rubrique et du site entier
+    """
+    cles = set()
+    for categorie, annee, mois in mois_touches:
+        for nom in (categorie, None):
+            cles.update((cle_page_archives(nom), cle_page_archives(nom, annee),
+                         cle_page_archives(nom, annee, mois)))
+    return cles
+
+
+def cle_cache_publicites(position):
+    """Clé de cache d'un emplacement publicitaire"""
+    return f"nimba:publicites:{position}"
+
+
+# Clé de cache de la table {id: lien} des publicités (redirection des clics)
+CLE_LIENS_PUBLICITES = 'nimba:publicites:liens'
+
+
+def cle_version_listes(auteur_id):
+    """Clé de la version des listes d'un rédacteur (articles et publicités)"""
+    return f"nimba:listes:{auteur_id}:version"
+
+
+def version_listes(auteur_id):
+    """Version courante des listes d'un rédacteur, utilisée dans les clés des totaux en cache"""
+    version = cache.get(cle_version_listes(auteur_id))
+    if version is None:
+        version = time.time_ns()
+        cache.set(cle_version_listes(auteur_id), version, None)
+    return version
+
+
+def changer_version_listes(auteur_id):
+    """Rend obsolètes les totaux en cache d'un rédacteur (création, modification, suppression)"""
+    cache.set(cle_version_listes(auteur_id), time.time_ns(), None)
+
+
+def reponse_versionnee(prefixe, fonction_version, timeout=DUREE_CACHE_REPONSES, max_age=300, parametres=()):
+    """
+    Décorateur de vue : met la réponse en cache sous une clé dépendant de la
+    version du contenu et gère les requêtes conditionnelles (ETag / Last-Modified).
+
+    `fonction_version` reçoit les arguments de la vue et renvoie un tuple
+    (date de dernière modification, compteur). Tant que ce tuple ne change pas,
+    la réponse est servie depuis le cache sans être régénérée.
+
+    `parametres` liste les paramètres de la query string lus par la vue : seuls
+    ceux-là entrent dans la clé, les autres (marqueurs de campagne, valeurs au
+    hasard) ne créent pas de nouvelle entrée dans le cache.
+    """
+    def decorateur(vue):
+        @wraps(vue)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return vue(request, *args, **kwargs)
+
+            derniere_modification, compteur = fonction_version(*args, **kwargs)
+            horodatage = timegm(derniere_modification.utctimetuple()) if derniere_modification else 0
+            etag = quote_etag(f"{prefixe}-{horodatage}-{compteur}")
+            last_modified = horodatage or None
+
+            reponse = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if reponse is not None:
+                return reponse
+
+            requete = urlencode(sorted(
+                (parametre, request.GET[parametre]) for parametre in parametres if parametre in request.GET
+            ))
+            cle = f"nimba:{prefixe}:{request.path}?{requete}:{horodatage}:{compteur}"
+            reponse = cache.get(cle)
+            if reponse is None:
+                reponse = vue(request, *args, **kwargs)
+                if reponse.status_code != 200:
+                    return reponse
+                if hasattr(reponse, 'render') and callable(reponse.render):
+                    reponse = reponse.render()
+                cache.set(cle, reponse, timeout)
+                logger.debug(f"Réponse régénérée pour {cle}")
+
+            reponse.headers['ETag'] = etag
+            if last_modified:
+                reponse.headers['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(reponse, public=True, max_age=max_age)
+            return reponse
+
+        return wrapper
+
+    return decorateur
@@ -0,0 +1,21 @@
+"""
+Vérifications de la configuration (manage.py check).
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from .cache_utils import cache_est_partage
+
+
+@register(Tags.caches)
+def verifier_cache_partage(app_configs, **kwargs):
+    """Le cache par défaut doit être partagé entre les workers et les commandes"""
+    if not cache_est_partage():
+        backend = settings.CACHES.get('default', {}).get('BACKEND')
+        return [Warning(
+            f"Le cache par défaut ({backend}) n'est pas partagé entre les processus.",
+            hint="Les invalidations, les verrous du cache des pages, le préchauffage et la "
+                 "limitation de débit ne valent alors que pour un seul processus. "
+                 "Configurez Redis ou Memcached dans CACHES en production.",
+            id='nimbaApp.W001',
+        )]
+    return []
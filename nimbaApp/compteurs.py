@@ -0,0 +1,142 @@
+"""
+Agrégats dénormalisés des catégories : nombre d'articles publiés, derniers
+articles publiés (identifiants et date du plus récent) et total des vues.
+
+- le nombre d'articles et les derniers articles sont recalculés pour les
+  seules catégories touchées, à chaque enregistrement ou suppression d'un
+  article, dans la même transaction ; les deux requêtes ne lisent que l'index
+  (categorie, est_publie, date_publication) ;
+- le total des vues est la somme des `vues_comptees` des articles publiés,
+  tenue par différences : les lectures (UPDATE sans signal) sont reportées à
+  la fois sur l'article et sur sa catégorie à chaque passage de
+  `calculer_tendances`, et une dépublication ou un changement de catégorie
+  ne déplace que ces vues déjà reportées, jamais celles en attente ;
+- le nombre d'articles publiés par catégorie et par mois (ArchiveMois, pour
+  les archives) évolue par différences, dans la même transaction ; les pages
+  d'archives des mois touchés sont invalidées après le commit ;
+- la commande `recalculer_compteurs_categories` recalcule tout depuis les
+  articles, en cas de dérive.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+from .cache_utils import cache_pages, cles_pages_archives
+from .models import ArchiveMois, Article, Categorie
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Nombre de derniers articles retenus par catégorie (sections de la page d'accueil)
+NB_DERNIERS_ARTICLES = 3
+
+
+def etats_articles(article_ids):
+    """Catégorie, publication et vues reportées des articles tels qu'enregistrés en base"""
+    return list(Article.objects.filter(pk__in=article_ids).values(
+        'categorie_id', 'est_publie', 'vues_comptees', 'date_publication'
+    ))
+
+
+def recalculer_publies(categorie_ids):
+    """Recompte les articles publiés et retrouve les derniers publiés des catégories données"""
+    for categorie_id in sorted(set(categorie_ids)):
+        publies = Article.objects.filter(categorie_id=categorie_id, est_publie=True)
+        derniers = list(
+            publies.order_by('-date_publication', '-id').values_list('id', 'date_publication')[:NB_DERNIERS_ARTICLES]
+        )
+        Categorie.objects.filter(id=categorie_id).update(
+            nb_articles_publies=publies.count(),
+            dernier_article_id=derniers[0][0] if derniers else None,
+            date_dernier_article=derniers[0][1] if derniers else None,
+            derniers_articles_ids=[article_id for article_id, _ in derniers],
+        )
+
+
+def ajouter_vues(deltas):
+    """Ajoute des vues au total des catégories : {categorie_id: nombre de vues}"""
+    for categorie_id, delta in sorted(deltas.items()):
+        if delta:
+            Categorie.objects.filter(id=categorie_id).update(total_vues=F('total_vues') + delta)
+
+
+def ajouter_archives(deltas):
+    """Ajoute des articles publiés aux archives mensuelles : {(categorie_id, annee, mois): nombre}"""
+    for (categorie_id, annee, mois), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        archive, _ = ArchiveMois.objects.get_or_create(categorie_id=categorie_id, annee=annee, mois=mois)
+        ArchiveMois.objects.filter(pk=archive.pk).update(nb_articles=F('nb_articles') + delta)
+
+
+def invalider_pages_archives(mois_touches):
+    """Invalide les pages d'archives des mois donnés : {(categorie_id, annee, mois)}"""
+    try:
+        noms = dict(Categorie.objects.filter(
+            id__in={categorie_id for categorie_id, _, _ in mois_touches}
+        ).values_list('id', 'nom'))
+        cache_pages.invalider(*cles_pages_archives(
+            (noms.get(categorie_id), annee, mois) for categorie_id, annee, mois in mois_touches
+        ))
+    except Exception as e:
+        logger.error(f"Erreur lors de l'invalidation des archives : {str(e)}")
+
+
+def articles_modifies(etats_avant, etats_apres):
+    """
+    Met à jour les catégories après l'enregistrement, la suppression ou la
+    modification en masse d'articles, à partir de leurs états (voir
+    etats_articles) avant et après le changement
+    """
+    deltas = {}
+    deltas_archives = {}
+    categorie_ids = set()
+    for etats, signe in ((etats_avant, -1), (etats_apres, 1)):
+        for etat in etats:
+            categorie_ids.add(etat['categorie_id'])
+            if etat['est_publie']:
+                deltas[etat['categorie_id']] = deltas.get(etat['categorie_id'], 0) + signe * etat['vues_comptees']
+                date = timezone.localtime(etat['date_publication'])
+                mois = (etat['categorie_id'], date.year, date.month)
+                deltas_archives[mois] = deltas_archives.get(mois, 0) + signe
+
+    with transaction.atomic():
+        recalculer_publies(categorie_ids)
+        ajouter_vues(deltas)
+        ajouter_archives(deltas_archives)
+        if deltas_archives:
+            # Mois dont la liste a pu changer, même si leur total est inchangé (modification)
+            mois_touches = set(deltas_archives)
+            transaction.on_commit(lambda: invalider_pages_archives(mois_touches))
+
+
+def recalculer_archives():
+    """Reconstruit les archives mensuelles depuis les articles publiés"""
+    mois = (
+        Article.objects.filter(est_publie=True)
+        .annotate(annee=ExtractYear('date_publication'), mois=ExtractMonth('date_publication'))
+        .values('categorie_id', 'annee', 'mois').annotate(nb=Count('id')).order_by()
+    )
+    ArchiveMois.objects.all().delete()
+    ArchiveMois.objects.bulk_create([
+        ArchiveMois(categorie_id=ligne['categorie_id'], annee=ligne['annee'], mois=ligne['mois'],
+                    nb_articles=ligne['nb'])
+        for ligne in mois
+    ])
+
+
+def recalculer_toutes_categories():
+    """Recalcule les agrégats des catégories et les archives mensuelles ; renvoie le nombre de catégories"""
+    vues = dict(
+        Article.objects.filter(est_publie=True).values('categorie_id').annotate(
+            vues=Sum('vues_comptees')
+        ).order_by().values_list('categorie_id', 'vues')
+    )
+    categorie_ids = list(Categorie.objects.values_list('id', flat=True))
+    with transaction.atomic():
+        recalculer_publies(categorie_ids)
+        for categorie_id in categorie_ids:
+            Categorie.objects.filter(id=categorie_id).update(total_vues=vues.get(categorie_id) or 0)
+        recalculer_archives()
+    logger.info(f"Compteurs de {len(categorie_ids)} catégorie(s) recalculés")
+    return len(categorie_ids)
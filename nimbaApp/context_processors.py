@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+from django.contrib.staticfiles import finders
+
+# Feuille Tailwind construite par la commande construire_assets
+FEUILLE_COMPILEE = 'nimbaApp/css/tailwind.min.css'
+
+
+@lru_cache(maxsize=1)
+def _css_compile_disponible():
+    return finders.find(FEUILLE_COMPILEE) is not None
+
+
+def assets(request):
+    """Indique aux gabarits si la feuille compilée existe (sinon : Tailwind dans le navigateur)"""
+    return {'css_compile': _css_compile_disponible()}
@@ -29,7 +29,7 @@ def envoyer_newsletter_nouvel_article(article):
     # Contexte pour le template
     contexte = {
         'article': article,
-        'site_url': 'http://127.0.0.1:8000',  # À remplacer par votre domaine en production
+        'site_url': settings.SITE_URL,
     }
 
     # Contenu HTML de l'email
@@ -57,6 +57,33 @@ def envoyer_newsletter_nouvel_article(article):
         return 0
 
 
+def preparer_digest_newsletter(articles, emails_destinataires, connection=None):
+    """
+    Prépare (sans l'envoyer) l'email groupé présentant les articles publiés
+    depuis le dernier envoi, adressé en copie cachée aux destinataires
+    """
+    if len(articles) == 1:
+        sujet = f"📰 Nouvel article : {articles[0].titre}"
+    else:
+        sujet = f"📰 {len(articles)} nouveaux articles sur Nimba24"
+
+    contexte = {
+        'articles': articles,
+        'site_url': settings.SITE_URL,
+    }
+    html_content = render_to_string('digest_newsletter.html', contexte)
+
+    email = EmailMultiAlternatives(
+        subject=sujet,
+        body=strip_tags(html_content),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        bcc=emails_destinataires,
+        connection=connection,
+    )
+    email.attach_alternative(html_content, "text/html")
+    return email
+
+
 def envoyer_email_bienvenue_newsletter(email_abonne):
     """
     Envoie un email de bienvenue à un nouvel abonné
@@ -65,7 +92,7 @@ def envoyer_email_bienvenue_newsletter(email_abonne):
 
     contexte = {
         'email': email_abonne,
-        'site_url': 'http://127.0.0.1:8000',
+        'site_url': settings.SITE_URL,
     }
 
     try:
@@ -0,0 +1,82 @@
+from django.contrib.syndication.views import Feed
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+from .models import Article, Categorie
+
+# Nombre d'articles exposés dans chaque flux
+NB_ARTICLES_FLUX = 30
+
+
+def version_articles(categorie=None):
+    """
+    Renvoie (dernière modification, nombre d'articles publiés), globalement ou
+    pour une catégorie. Une seule requête d'agrégat suffit à savoir si un flux
+    doit être régénéré.
+    """
+    articles = Article.objects.filter(est_publie=True)
+    if categorie:
+        articles = articles.filter(categorie__nom=categorie)
+    agregats = articles.aggregate(derniere=Max('date_modification'), nombre=Count('id'))
+    return agregats['derniere'], agregats['nombre']
+
+
+class DerniersArticlesFeed(Feed):
+    """Flux RSS des derniers articles publiés (global ou par catégorie)"""
+
+    def get_object(self, request, categorie=None):
+        if categorie is None:
+            return None
+        return get_object_or_404(Categorie, nom=categorie)
+
+    def title(self, obj):
+        if obj is None:
+            return "Nimba24 - Derniers articles"
+        return f"Nimba24 - {obj.get_nom_display()}"
+
+    def link(self, obj):
+        if obj is None:
+            return reverse('nimbaApp:home')
+        return reverse('nimbaApp:categorie', args=[obj.nom])
+
+    def description(self, obj):
+        if obj is None:
+            return "L'information au cœur du Nimba"
+        return obj.description or f"Les derniers articles de la rubrique {obj.get_nom_display()}"
+
+    def items(self, obj):
+        articles = Article.objects.filter(est_publie=True).select_related('categorie', 'auteur')
+        if obj is not None:
+            articles = articles.filter(categorie=obj)
+        return articles.order_by('-date_publication')[:NB_ARTICLES_FLUX]
+
+    def item_title(self, item):
+        return item.titre
+
+    def item_description(self, item):
+        return item.sous_titre or Truncator(item.contenu).words(60)
+
+    def item_link(self, item):
+        return reverse('nimbaApp:article_detail', args=[item.id])
+
+    def item_pubdate(self, item):
+        return item.date_publication
+
+    def item_updateddate(self, item):
+        return item.date_modification
+
+    def item_author_name(self, item):
+        return item.auteur.get_full_name() or item.auteur.username
+
+    def item_categories(self, item):
+        return [item.categorie.get_nom_display()]
+
+
+class DerniersArticlesAtomFeed(DerniersArticlesFeed):
+    """Variante Atom du flux des derniers articles"""
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
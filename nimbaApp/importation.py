@@ -0,0 +1,377 @@
+"""
+Import en masse d'articles (reprise de l'ancien site).
+
+Les articles sont lus au fil de l'eau depuis un fichier JSON Lines ou CSV,
+validés puis insérés par lots avec bulk_create, un lot par transaction :
+
+- la catégorie est retrouvée par son `nom`, l'auteur par son nom d'utilisateur
+  (ou l'auteur par défaut) ;
+- bulk_create n'envoie aucun signal et l'import n'appelle pas
+  annoncer_article : aucune newsletter ne part, aucune page n'est pré-rendue
+  article par article. Les compteurs des catégories et les archives
+  mensuelles sont mis à jour lot par lot, les caches une fois à la fin ;
+- l'import est rejouable : un article déjà présent (même titre et même date
+  de publication) est ignoré, et la dernière ligne importée est notée dans un
+  fichier de reprise pour repartir de là après une interruption ;
+- les lignes rejetées sont recopiées, au format d'origine, dans
+  `<fichier>.rejets` : une fois corrigé, ce fichier s'importe à son tour ;
+- les pages d'archives des mois touchés sont invalidées lot par lot (voir
+  compteurs.articles_modifies) ; les flux, sitemaps et l'API suivent la
+  version des articles (date de modification et nombre), qui change à
+  chaque insertion ou image ajoutée ;
+- les images sont traitées ensuite, par une seconde passe sur le fichier,
+  exécutée après celle des articles (dans la même commande, ou seule avec
+  --images-seulement) : lot par lot, les copies dans le stockage des médias
+  sont réparties sur plusieurs threads, puis la dernière ligne traitée est
+  notée dans un fichier de reprise distinct ; un article qui a déjà une
+  image n'est pas modifié.
+"""
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .cache_utils import cache_pages, changer_version_listes
+from .compteurs import articles_modifies, invalider_pages_archives
+from .models import Article, Categorie
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'articles insérés par transaction
+TAILLE_LOT_IMPORT = 500
+
+# Fichier de reprise de l'étape des images : <fichier>.reprise-images
+ETAPE_IMAGES = 'reprise-images'
+
+CHAMPS_BOOLEENS = ('est_publie', 'est_a_la_une')
+VALEURS_VRAIES = ('1', 'true', 'vrai', 'oui', 'yes')
+
+
+class ErreurImport(Exception):
+    """Ligne du fichier d'import invalide"""
+
+
+def format_fichier(chemin, format_source=None):
+    return format_source or ('csv' if str(chemin).lower().endswith('.csv') else 'jsonl')
+
+
+def lire_source(chemin, format_source=None):
+    """
+    Enregistrements du fichier, un par un : (numéro de ligne, dictionnaire), ou
+    (numéro de ligne, texte brut) pour une ligne JSON illisible
+    """
+    with open(chemin, encoding='utf-8', newline='') as fichier:
+        if format_fichier(chemin, format_source) == 'csv':
+            for numero, ligne in enumerate(csv.DictReader(fichier), start=2):
+                yield numero, ligne
+        else:
+            for numero, ligne in enumerate(fichier, start=1):
+                if ligne.strip():
+                    try:
+                        yield numero, json.loads(ligne)
+                    except ValueError:
+                        yield numero, ligne.rstrip('\r\n')
+
+
+def chemin_reprise(chemin, etape='reprise'):
+    return Path(f"{chemin}.{etape}")
+
+
+def lire_reprise(chemin, etape='reprise'):
+    """Dernière ligne traitée par l'étape lors d'un passage précédent (0 si aucun)"""
+    try:
+        return int(chemin_reprise(chemin, etape).read_text())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _ecrire_reprise(chemin, numero, etape='reprise'):
+    temporaire = Path(f"{chemin_reprise(chemin, etape)}.tmp")
+    temporaire.write_text(str(numero))
+    os.replace(temporaire, chemin_reprise(chemin, etape))
+
+
+def chemin_rejets(chemin):
+    return Path(f"{chemin}.rejets")
+
+
+def _ecrire_rejets(chemin, format_source, rejets):
+    """Ajoute des enregistrements rejetés à <fichier>.rejets, dans le format du fichier d'origine"""
+    fichier_rejets = chemin_rejets(chemin)
+    nouveau = not fichier_rejets.exists() or fichier_rejets.stat().st_size == 0
+    with open(fichier_rejets, 'a', encoding='utf-8', newline='') as fichier:
+        if format_fichier(chemin, format_source) == 'csv':
+            # Colonnes du fichier d'origine (une ligne trop longue a une clé None, écartée)
+            ecrivain = csv.DictWriter(fichier, fieldnames=[cle for cle in rejets[0] if cle is not None],
+                                      extrasaction='ignore')
+            if nouveau:
+                ecrivain.writeheader()
+            ecrivain.writerows(rejets)
+        else:
+            for donnees in rejets:
+                ligne = donnees if isinstance(donnees, str) else json.dumps(donnees, ensure_ascii=False)
+                fichier.write(ligne + '\n')
+
+
+def cle_naturelle(donnees):
+    """
+    (titre, date de publication) d'un enregistrement : identifie l'article lors
+    d'un nouveau passage, la date est donc obligatoire
+    """
+    if not isinstance(donnees, dict):
+        raise ErreurImport("Ligne illisible")
+    titre = (donnees.get('titre') or '').strip()
+    if not titre:
+        raise ErreurImport("Titre manquant")
+    if len(titre) > Article._meta.get_field('titre').max_length:
+        raise ErreurImport("Titre trop long")
+    if not donnees.get('date_publication'):
+        raise ErreurImport("Date de publication manquante")
+    date_publication = parse_datetime(str(donnees['date_publication']).strip())
+    if date_publication is None:
+        raise ErreurImport(f"Date invalide : {donnees['date_publication']}")
+    if timezone.is_naive(date_publication):
+        date_publication = timezone.make_aware(date_publication)
+    return titre, date_publication
+
+
+class Importeur:
+    """Valide les enregistrements et les insère par lots"""
+
+    def __init__(self, auteur_par_defaut=None, taille_lot=TAILLE_LOT_IMPORT):
+        self.taille_lot = max(1, taille_lot)
+        self.categories = {categorie.nom: categorie.id for categorie in Categorie.objects.all()}
+        self.auteurs = {}
+        self.auteur_par_defaut = self._auteur(auteur_par_defaut) if auteur_par_defaut else None
+        self.nb_importes = self.nb_ignores = 0
+        self.erreurs = []
+        self.auteur_ids = set()
+
+    def _auteur(self, username):
+        if username not in self.auteurs:
+            self.auteurs[username] = User.objects.filter(username=username).values_list('id', flat=True).first()
+        if self.auteurs[username] is None:
+            raise ErreurImport(f"Auteur inconnu : {username}")
+        return self.auteurs[username]
+
+    def valider(self, donnees):
+        """Article (non enregistré) construit à partir d'un enregistrement, ou ErreurImport"""
+        titre, date_publication = cle_naturelle(donnees)
+        contenu = donnees.get('contenu') or ''
+        if not contenu.strip():
+            raise ErreurImport("Contenu manquant")
+        sous_titre = (donnees.get('sous_titre') or '').strip()
+        if len(sous_titre) > Article._meta.get_field('sous_titre').max_length:
+            raise ErreurImport("Sous-titre trop long")
+
+        categorie_id = self.categories.get((donnees.get('categorie') or '').strip())
+        if categorie_id is None:
+            raise ErreurImport(f"Catégorie inconnue : {donnees.get('categorie')}")
+
+        if donnees.get('auteur'):
+            auteur_id = self._auteur(donnees['auteur'].strip())
+        elif self.auteur_par_defaut:
+            auteur_id = self.auteur_par_defaut
+        else:
+            raise ErreurImport("Auteur manquant")
+
+        booleens = {}
+        for champ in CHAMPS_BOOLEENS:
+            valeur = donnees.get(champ)
+            if valeur in (None, ''):
+                booleens[champ] = champ == 'est_publie'
+            else:
+                booleens[champ] = str(valeur).strip().lower() in VALEURS_VRAIES
+
+        try:
+            vues = int(donnees.get('vues') or 0)
+        except (TypeError, ValueError):
+            raise ErreurImport(f"Nombre de vues invalide : {donnees.get('vues')}")
+
+        return Article(
+            titre=titre,
+            sous_titre=sous_titre,
+            contenu=contenu,
+            categorie_id=categorie_id,
+            auteur_id=auteur_id,
+            date_publication=date_publication,
+            vues=max(0, vues),
+            # Vues reprises de l'ancien site : reportées sur la catégorie dès l'insertion
+            vues_comptees=max(0, vues),
+            **booleens,
+        )
+
+    def _inserer(self, articles):
+        """Insère un lot en ignorant les articles déjà présents (import rejoué)"""
+        cles = {(article.titre, article.date_publication) for article in articles}
+        existants = set(
+            Article.objects.filter(titre__in={titre for titre, _ in cles})
+            .values_list('titre', 'date_publication')
+        )
+        nouveaux = []
+        for article in articles:
+            cle = (article.titre, article.date_publication)
+            if cle in existants:
+                self.nb_ignores += 1
+            else:
+                existants.add(cle)
+                nouveaux.append(article)
+
+        with transaction.atomic():
+            Article.objects.bulk_create(nouveaux)
+            articles_modifies([], [
+                {'categorie_id': article.categorie_id, 'est_publie': article.est_publie,
+                 'vues_comptees': article.vues_comptees, 'date_publication': article.date_publication}
+                for article in nouveaux
+            ])
+        self.nb_importes += len(nouveaux)
+        self.auteur_ids.update(article.auteur_id for article in nouveaux)
+
+    def importer(self, chemin, format_source=None, reprendre=False):
+        """
+        Importe le fichier ; renvoie (importés, ignorés car déjà présents, erreurs [(ligne, message)]).
+        Les lignes rejetées sont recopiées dans <fichier>.rejets, vidé au début d'un nouvel import.
+        """
+        depart = lire_reprise(chemin) if reprendre else 0
+        if not reprendre:
+            chemin_rejets(chemin).unlink(missing_ok=True)
+        lot, rejets = [], []
+        dernier_numero = depart
+        for numero, donnees in lire_source(chemin, format_source):
+            if numero <= depart:
+                continue
+            try:
+                lot.append(self.valider(donnees))
+            except ErreurImport as e:
+                self.erreurs.append((numero, str(e)))
+                rejets.append(donnees)
+            dernier_numero = numero
+            if len(lot) >= self.taille_lot:
+                self._inserer(lot)
+                # Rejets écrits avant d'avancer la reprise : aucune ligne n'est perdue
+                if rejets:
+                    _ecrire_rejets(chemin, format_source, rejets)
+                _ecrire_reprise(chemin, dernier_numero)
+                lot, rejets = [], []
+        if lot:
+            self._inserer(lot)
+        if rejets:
+            _ecrire_rejets(chemin, format_source, rejets)
+        _ecrire_reprise(chemin, dernier_numero)
+
+        if self.nb_importes:
+            invalider_apres_import(self.auteur_ids)
+        logger.info(f"Import de {chemin} : {self.nb_importes} article(s) importé(s), "
+                    f"{self.nb_ignores} déjà présent(s), {len(self.erreurs)} erreur(s)")
+        return self.nb_importes, self.nb_ignores, self.erreurs
+
+
+def invalider_apres_import(auteur_ids):
+    """Une seule invalidation des pages et des listes pour tout l'import"""
+    cles = ['home'] + [f'categorie:{nom}' for nom in Categorie.objects.values_list('nom', flat=True)]
+    cache_pages.invalider(*cles)
+    for auteur_id in auteur_ids:
+        changer_version_listes(auteur_id)
+
+
+def _invalider_archives_articles(article_ids):
+    """Pages d'archives des mois des articles publiés donnés (étape des images, lot par lot)"""
+    mois_touches = set()
+    for categorie_id, date_publication in Article.objects.filter(
+        id__in=article_ids, est_publie=True
+    ).values_list('categorie_id', 'date_publication'):
+        date = timezone.localtime(date_publication)
+        mois_touches.add((categorie_id, date.year, date.month))
+    if mois_touches:
+        invalider_pages_archives(mois_touches)
+
+
+def _importer_image(article_id, chemin_image):
+    """Copie une image dans le stockage des médias et l'associe à l'article"""
+    try:
+        champ = Article._meta.get_field('image')
+        with open(chemin_image, 'rb') as fichier:
+            nom = default_storage.save(champ.generate_filename(None, chemin_image.name), File(fichier))
+        # Nouvelle date de modification : nouvelle version des flux, sitemaps et de l'API
+        Article.objects.filter(Q(image='') | Q(image__isnull=True), id=article_id).update(
+            image=nom, date_modification=timezone.now()
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors de l'import de l'image {chemin_image} (article {article_id}) : {str(e)}")
+        return False
+    finally:
+        connections.close_all()
+
+
+def importer_images(chemin, dossier_images, format_source=None, nb_threads=4, taille_lot=TAILLE_LOT_IMPORT,
+                    reprendre=False):
+    """
+    Étape des images : associe à chaque article importé sans image le fichier
+    nommé dans la colonne `image`, lot par lot, en notant la dernière ligne
+    traitée après chaque lot. Renvoie (images importées, images introuvables).
+    """
+    dossier_images = Path(dossier_images)
+    depart = lire_reprise(chemin, ETAPE_IMAGES) if reprendre else 0
+    importees = 0
+    introuvables = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, nb_threads)) as executeur:
+        def traiter(lot, dernier_numero):
+            nonlocal importees
+            # (titre, date) -> id des articles du lot qui n'ont pas encore d'image
+            ids = {
+                (titre, date_publication): article_id
+                for article_id, titre, date_publication in Article.objects.filter(
+                    Q(image='') | Q(image__isnull=True), titre__in={titre for titre, _, _ in lot}
+                ).values_list('id', 'titre', 'date_publication')
+            }
+            taches = [
+                (ids[(titre, date_publication)], chemin_image)
+                for titre, date_publication, chemin_image in lot if (titre, date_publication) in ids
+            ]
+            resultats = list(executeur.map(lambda tache: _importer_image(*tache), taches))
+            article_ids = [tache[0] for tache, resultat in zip(taches, resultats) if resultat]
+            if article_ids:
+                _invalider_archives_articles(article_ids)
+            importees += len(article_ids)
+            # Reprise avancée une fois les images du lot enregistrées
+            _ecrire_reprise(chemin, dernier_numero, ETAPE_IMAGES)
+
+        lot = []
+        dernier_numero = depart
+        for numero, donnees in lire_source(chemin, format_source):
+            if numero <= depart:
+                continue
+            dernier_numero = numero
+            if not isinstance(donnees, dict) or not donnees.get('image'):
+                continue
+            try:
+                titre, date_publication = cle_naturelle(donnees)
+            except ErreurImport:
+                # Déjà signalée par l'étape des articles
+                continue
+            chemin_image = dossier_images / donnees['image']
+            if not chemin_image.is_file():
+                introuvables += 1
+                logger.warning(f"Image introuvable ligne {numero} : {chemin_image}")
+                continue
+            lot.append((titre, date_publication, chemin_image))
+            if len(lot) >= taille_lot:
+                traiter(lot, dernier_numero)
+                lot = []
+        traiter(lot, dernier_numero)
+
+    if importees:
+        invalider_apres_import([])
+    logger.info(f"Images de {chemin} : {importees} importée(s), {introuvables} introuvable(s)")
+    return importees, introuvables
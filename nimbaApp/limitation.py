@@ -0,0 +1,161 @@
+"""
+Limitation de débit des points d'écriture publics (inscription à la
+newsletter, clics sur les publicités, lectures des pages pré-rendues).
+
+Chaque couple (point d'accès, adresse IP du client) dispose d'un seau de
+jetons : `capacite` requêtes d'affilée au plus, puis `par_minute` requêtes
+par minute. Une inscription sans jeton est refusée (429) avant tout accès à
+la base ou envoi d'email ; un clic sans jeton mène quand même à l'annonceur
+mais n'est pas compté, une lecture sans jeton n'est pas comptée non plus.
+
+Les seaux sont gardés dans le cache Django, commun aux workers seulement si
+ce cache est partagé (Redis, voir CACHES ; la lecture puis l'écriture
+n'étant pas atomiques, une rafale simultanée peut dépasser légèrement la
+limite), ou dans la mémoire du processus (LIMITATION_DEBIT_STOCKAGE =
+'local') : chaque worker applique alors sa propre limite.
+
+Les clics répétés d'une même adresse sur une même publicité, comme les
+lectures répétées d'un même article, ne sont comptés qu'une fois par délai
+de dédoublonnage (voir clic_deja_compte et vue_deja_comptee).
+"""
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from .cache_utils import CacheLocal
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seaux gardés en mémoire quand le stockage est local (les plus anciens sont écartés)
+TAILLE_SEAUX_LOCAUX = 10000
+
+# Compteurs affichés sur le dashboard
+COMPTEURS = ('acceptees', 'refusees', 'doublons')
+
+_seaux_locaux = CacheLocal(TAILLE_SEAUX_LOCAUX)
+_verrou_seaux = threading.Lock()
+
+
+def adresse_client(request):
+    """
+    Adresse IP du client : REMOTE_ADDR, ou, derrière des proxys de confiance
+    (LIMITATION_DEBIT_NB_PROXYS), l'adresse qu'ils ont ajoutée à X-Forwarded-For
+    """
+    nb_proxys = settings.LIMITATION_DEBIT_NB_PROXYS
+    if nb_proxys:
+        adresses = [adresse.strip() for adresse in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+        if len(adresses) >= nb_proxys and adresses[-nb_proxys]:
+            return adresses[-nb_proxys]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _cle_compteur(nom, compteur):
+    return f"nimba:debit:statistiques:{nom}:{compteur}"
+
+
+def _compter(nom, compteur):
+    """Incrémente un compteur dans le cache partagé : cumulé sur tous les workers"""
+    cle = _cle_compteur(nom, compteur)
+    if not cache.add(cle, 1, None):
+        try:
+            cache.incr(cle)
+        except ValueError:
+            # Clé écartée entre add et incr
+            cache.add(cle, 1, None)
+
+
+def statistiques():
+    """
+    Requêtes acceptées, refusées et clics en double par point d'accès, tous
+    workers confondus, depuis le dernier vidage du cache
+    """
+    cles = {_cle_compteur(nom, compteur): (nom, compteur)
+            for nom in settings.LIMITATION_DEBIT for compteur in COMPTEURS}
+    valeurs = cache.get_many(list(cles))
+    resultat = {}
+    for cle, (nom, compteur) in cles.items():
+        resultat.setdefault(nom, {})[compteur] = valeurs.get(cle, 0)
+    return {nom: compteurs for nom, compteurs in resultat.items() if any(compteurs.values())}
+
+
+def _prendre_jeton(seau, capacite, par_minute, maintenant):
+    """Recharge le seau depuis le dernier passage puis tente d'y prendre un jeton ; renvoie (seau, accepté)"""
+    jetons, dernier_passage = seau or (capacite, maintenant)
+    jetons = min(capacite, jetons + (maintenant - dernier_passage) * par_minute / 60)
+    if jetons >= 1:
+        return (jetons - 1, maintenant), True
+    return (jetons, maintenant), False
+
+
+def autoriser(nom, adresse):
+    """Consomme un jeton du seau (nom, adresse) ; renvoie False si la limite est atteinte"""
+    limite = settings.LIMITATION_DEBIT[nom]
+    capacite, par_minute = limite['capacite'], limite['par_minute']
+    cle = f"nimba:debit:{nom}:{adresse}"
+    # Délai au bout duquel un seau inutilisé est plein : inutile de le garder plus longtemps
+    duree = int(capacite * 60 / par_minute) + 1
+    maintenant = time.time()
+
+    if settings.LIMITATION_DEBIT_STOCKAGE == 'local':
+        with _verrou_seaux:
+            seau, accepte = _prendre_jeton(_seaux_locaux.get(cle), capacite, par_minute, maintenant)
+            _seaux_locaux.set(cle, seau, duree)
+    else:
+        seau, accepte = _prendre_jeton(cache.get(cle), capacite, par_minute, maintenant)
+        cache.set(cle, seau, duree)
+
+    _compter(nom, 'acceptees' if accepte else 'refusees')
+    return accepte
+
+
+def requete_autorisee(request, nom):
+    """Vrai si la limitation est désactivée ou si l'adresse du client n'a pas atteint la limite du point d'accès"""
+    if not settings.LIMITATION_DEBIT_ACTIVE:
+        return True
+    adresse = adresse_client(request)
+    if autoriser(nom, adresse):
+        return True
+    logger.warning(f"Limite de débit atteinte pour {nom} par {adresse}")
+    return False
+
+
+def limiter_debit(nom):
+    """Décorateur de vue : refuse (429) les requêtes d'une adresse qui dépasse la limite du point d'accès"""
+    def decorateur(vue):
+        @wraps(vue)
+        def wrapper(request, *args, **kwargs):
+            if not requete_autorisee(request, nom):
+                limite = settings.LIMITATION_DEBIT[nom]
+                response = HttpResponse('Trop de requêtes, veuillez réessayer dans un instant.',
+                                        status=429, content_type='text/plain; charset=utf-8')
+                response['Retry-After'] = str(int(60 / limite['par_minute']) + 1)
+                return response
+            return vue(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorateur
+
+
+def _deja_compte(nom, cle, delai):
+    """Vrai si la clé a déjà été vue dans le délai (cache.add est atomique) ; compte alors un doublon"""
+    if cache.add(cle, 1, delai):
+        return False
+    _compter(nom, 'doublons')
+    return True
+
+
+def clic_deja_compte(request, publicite_id):
+    """Vrai si cette adresse a déjà cliqué sur cette publicité dans le délai de dédoublonnage"""
+    return _deja_compte('clic_publicite', f"nimba:clic:{publicite_id}:{adresse_client(request)}",
+                        settings.DEDOUBLONNAGE_CLICS)
+
+
+def vue_deja_comptee(request, article_id):
+    """Vrai si cette adresse a déjà lu cet article dans le délai de dédoublonnage"""
+    return _deja_compte('vue_article', f"nimba:vue:{article_id}:{adresse_client(request)}",
+                        settings.DEDOUBLONNAGE_VUES)
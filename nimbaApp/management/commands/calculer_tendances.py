@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+from nimbaApp.tendances import calculer_classements, mettre_a_jour_scores
+
+
+class Command(BaseCommand):
+    help = 'Met à jour les scores de tendance et les classements (à lancer régulièrement via cron)'
+
+    def handle(self, *args, **options):
+        debut = time.monotonic()
+        nb_articles = mettre_a_jour_scores()
+        classements = calculer_classements()
+        duree = time.monotonic() - debut
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {nb_articles} article(s) mis à jour, '
+            f'{len(classements["tendances"])} en tendance, en {duree:.2f}s'
+        ))
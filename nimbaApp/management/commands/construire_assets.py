@@ -0,0 +1,78 @@
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+DOSSIER_APP = Path(__file__).resolve().parents[2]
+
+# assets/tailwind.css et tailwind.config.js suivent la syntaxe de Tailwind v3
+# (@tailwind, -c), comme le CDN de repli de base.html : la v4 n'est pas compatible
+VERSION_TAILWIND = '3.4.17'
+URL_TAILWIND = f'https://github.com/tailwindlabs/tailwindcss/releases/tag/v{VERSION_TAILWIND}'
+
+
+class Command(BaseCommand):
+    help = ('Construit la feuille Tailwind purgée et minifiée à partir des classes utilisées '
+            'dans les gabarits, puis publie les fichiers statiques hachés et précompressés')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tailwind', default=getattr(settings, 'TAILWIND_CLI', None),
+                            help="Chemin de l'exécutable autonome Tailwind (défaut : tailwindcss dans le PATH)")
+        parser.add_argument('--sans-collectstatic', action='store_true',
+                            help='Construire uniquement la feuille, sans lancer collectstatic')
+
+    def handle(self, *args, **options):
+        tailwind = options['tailwind'] or shutil.which('tailwindcss')
+        if not tailwind:
+            raise CommandError(
+                f"Exécutable Tailwind introuvable. Téléchargez l'exécutable autonome v{VERSION_TAILWIND} "
+                f"({URL_TAILWIND}) ou indiquez-le avec --tailwind."
+            )
+        self.verifier_version(tailwind)
+
+        sortie = DOSSIER_APP / 'static' / 'nimbaApp' / 'css' / 'tailwind.min.css'
+        debut = time.monotonic()
+        # Tailwind parcourt les gabarits (voir `content` dans la configuration)
+        # et ne génère que les classes effectivement utilisées
+        commande = [
+            tailwind,
+            '-c', str(DOSSIER_APP / 'assets' / 'tailwind.config.js'),
+            '-i', str(DOSSIER_APP / 'assets' / 'tailwind.css'),
+            '-o', str(sortie),
+            '--minify',
+        ]
+        try:
+            subprocess.run(commande, check=True, cwd=DOSSIER_APP.parent)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise CommandError(f"Échec de la construction de la feuille Tailwind : {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {sortie.name} construite ({sortie.stat().st_size // 1024} Ko) en {time.monotonic() - debut:.1f}s'
+        ))
+
+        if not options['sans_collectstatic']:
+            call_command('collectstatic', interactive=False, verbosity=options['verbosity'])
+            self.stdout.write(self.style.SUCCESS('✓ Fichiers statiques publiés (noms hachés, variantes .gz/.br)'))
+
+    def verifier_version(self, tailwind):
+        """Refuse un exécutable d'une autre version majeure que celle des fichiers sources"""
+        # L'aide commence par « tailwindcss vX.Y.Z » en v3 comme en v4 (la v3 n'a pas d'option --version)
+        try:
+            aide = subprocess.run([tailwind, '--help'], capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.SubprocessError) as e:
+            raise CommandError(f"Impossible d'exécuter {tailwind} : {e}")
+        correspondance = re.search(r'tailwindcss v((\d+)\.\d+\.\d+)', aide.stdout + aide.stderr)
+        if not correspondance:
+            raise CommandError(f"Version de {tailwind} illisible : exécutable Tailwind v{VERSION_TAILWIND} attendu.")
+        version, majeure = correspondance.groups()
+        if majeure != VERSION_TAILWIND.split('.')[0]:
+            raise CommandError(
+                f"Tailwind v{version} trouvé, mais les fichiers de assets/ sont écrits pour la v3. "
+                f"Téléchargez l'exécutable autonome v{VERSION_TAILWIND} ({URL_TAILWIND})."
+            )
+        self.stdout.write(f'Tailwind v{version}')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from nimbaApp.newsletter import envoyer_digests
+
+
+class Command(BaseCommand):
+    help = 'Envoie la newsletter groupée aux abonnés dont la fréquence d\'envoi est atteinte (à lancer par cron)'
+
+    def handle(self, *args, **options):
+        nb_emails, nb_abonnes = envoyer_digests()
+        self.stdout.write(self.style.SUCCESS(f'✓ {nb_emails} email(s) envoyé(s) à {nb_abonnes} abonné(s)'))
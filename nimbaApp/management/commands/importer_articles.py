@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from nimbaApp.importation import TAILLE_LOT_IMPORT, ErreurImport, Importeur, chemin_rejets, importer_images
+
+# Nombre d'erreurs de validation affichées (toutes sont comptées)
+NB_ERREURS_AFFICHEES = 20
+
+
+class Command(BaseCommand):
+    help = ('Importe en masse des articles depuis un fichier JSON Lines ou CSV (sans envoi de newsletter), '
+            'puis, avec --images, leurs images dans une seconde passe exécutée à la suite')
+
+    def add_arguments(self, parser):
+        parser.add_argument('fichier', help='Fichier .jsonl ou .csv (titre, sous_titre, contenu, categorie, '
+                                            'auteur, date_publication, est_publie, est_a_la_une, vues, image)')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], dest='format_source',
+                            help='Format du fichier (défaut : déduit de l\'extension)')
+        parser.add_argument('--images', dest='dossier_images',
+                            help='Dossier contenant les images nommées dans la colonne image '
+                                 '(étape exécutée après celle des articles)')
+        parser.add_argument('--auteur', help='Nom d\'utilisateur de l\'auteur des articles qui n\'en précisent pas')
+        parser.add_argument('--taille-lot', type=int, default=TAILLE_LOT_IMPORT,
+                            help='Nombre d\'articles insérés par transaction')
+        parser.add_argument('--reprendre', action='store_true',
+                            help='Repartir, pour chaque étape, après la dernière ligne traitée lors d\'un '
+                                 'passage interrompu')
+        parser.add_argument('--images-seulement', action='store_true',
+                            help='N\'exécuter que l\'étape des images')
+        parser.add_argument('--threads', type=int, default=4,
+                            help='Nombre de threads copiant les images d\'un même lot')
+
+    def handle(self, *args, **options):
+        debut = time.monotonic()
+        if not options['images_seulement']:
+            try:
+                importeur = Importeur(options['auteur'], options['taille_lot'])
+            except ErreurImport as e:
+                raise CommandError(str(e))
+            importes, ignores, erreurs = importeur.importer(
+                options['fichier'], options['format_source'], options['reprendre']
+            )
+            for numero, message in erreurs[:NB_ERREURS_AFFICHEES]:
+                self.stderr.write(f'Ligne {numero} : {message}')
+            if len(erreurs) > NB_ERREURS_AFFICHEES:
+                self.stderr.write(f'... et {len(erreurs) - NB_ERREURS_AFFICHEES} autre(s) erreur(s)')
+            if erreurs:
+                self.stderr.write(f'Lignes rejetées recopiées dans {chemin_rejets(options["fichier"])}')
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {importes} article(s) importé(s), {ignores} déjà présent(s), {len(erreurs)} ligne(s) rejetée(s)'
+            ))
+
+        if options['dossier_images']:
+            images, introuvables = importer_images(
+                options['fichier'], options['dossier_images'], options['format_source'],
+                options['threads'], options['taille_lot'], options['reprendre'],
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {images} image(s) importée(s), {introuvables} introuvable(s)'
+            ))
+        elif options['images_seulement']:
+            raise CommandError('--images-seulement nécessite --images')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Terminé en {time.monotonic() - debut:.1f}s'))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from nimbaApp.medias import DELAI_GRACE, nettoyer_medias
+
+
+class Command(BaseCommand):
+    help = 'Supprime les images envoyées qui ne sont plus référencées par aucun article ni publicité'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delai-grace', type=int, default=int(DELAI_GRACE.total_seconds() // 3600),
+                            help='Âge minimal en heures d\'un fichier orphelin avant suppression')
+        parser.add_argument('--simulation', action='store_true',
+                            help='Lister les fichiers orphelins sans les supprimer')
+
+    def handle(self, *args, **options):
+        nb_fichiers, octets = nettoyer_medias(
+            delai_grace=timedelta(hours=options['delai_grace']),
+            simulation=options['simulation'],
+        )
+        action = 'à supprimer' if options['simulation'] else 'supprimé(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {nb_fichiers} fichier(s) orphelin(s) {action}, {octets / 1024 / 1024:.1f} Mo'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from nimbaApp.sessions import TAILLE_LOT_SESSIONS, supprimer_sessions_expirees
+
+
+class Command(BaseCommand):
+    help = 'Supprime par lots les sessions expirées de la base'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taille-lot', type=int, default=TAILLE_LOT_SESSIONS,
+                            help='Nombre de sessions supprimées par requête')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Secondes d\'attente entre deux lots, pour ménager la base')
+
+    def handle(self, *args, **options):
+        total = supprimer_sessions_expirees(options['taille_lot'], options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'✓ {total} session(s) expirée(s) supprimée(s)'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from nimbaApp.cache_utils import cache_est_partage
+from nimbaApp.prechauffage import NB_ARTICLES_PRECHAUFFES, prechauffer
+
+
+class Command(BaseCommand):
+    help = 'Préchauffe les caches (pages, fragments publicitaires, classements, flux) après un déploiement'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=NB_ARTICLES_PRECHAUFFES,
+                            help="Nombre d'articles récents et d'articles les plus lus à préchauffer")
+        parser.add_argument('--threads', type=int, default=4,
+                            help='Nombre de threads de rendu')
+        parser.add_argument('--sans-flux', action='store_true',
+                            help='Ne pas préchauffer les flux RSS/Atom et les sitemaps')
+
+    def handle(self, *args, **options):
+        if not cache_est_partage():
+            # Les pages iraient dans la mémoire de cette commande, perdue à sa sortie
+            raise CommandError("Le cache par défaut n'est pas partagé entre les processus : "
+                               "configurez Redis ou Memcached dans CACHES avant de préchauffer")
+        reussies, total, duree = prechauffer(
+            nb_articles=options['articles'],
+            nb_threads=options['threads'],
+            avec_flux=not options['sans_flux'],
+        )
+        style = self.style.SUCCESS if reussies == total else self.style.WARNING
+        self.stdout.write(style(f'✓ {reussies}/{total} élément(s) préchauffé(s) en {duree:.2f}s'))
@@ -0,0 +1,52 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from nimbaApp.models import Article
+from nimbaApp.prerendu import prerendre_articles
+
+
+def _initialiser_processus():
+    """Chaque processus ouvre ses propres connexions à la base"""
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit les pages statiques pré-rendues de tous les articles publiés'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processus', type=int, default=os.cpu_count() or 1,
+                            help='Nombre de processus de rendu (défaut : nombre de CPU)')
+        parser.add_argument('--lot', type=int, default=200,
+                            help="Nombre d'articles confiés à un processus à la fois")
+        parser.add_argument('--article', type=int, action='append', dest='articles',
+                            help='Limiter la reconstruction à cet article (répétable)')
+
+    def handle(self, *args, **options):
+        debut = time.monotonic()
+        articles = Article.objects.filter(est_publie=True)
+        if options['articles']:
+            articles = articles.filter(id__in=options['articles'])
+        ids = list(articles.order_by('id').values_list('id', flat=True))
+        lot = max(1, options['lot'])
+        lots = [ids[i:i + lot] for i in range(0, len(ids), lot)]
+
+        ecrits = 0
+        if options['processus'] <= 1 or len(lots) <= 1:
+            for ids_lot in lots:
+                ecrits += prerendre_articles(ids_lot)
+        else:
+            # Ne pas partager la connexion du processus parent avec les processus fils
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['processus'],
+                                     initializer=_initialiser_processus) as executeur:
+                futures = [executeur.submit(prerendre_articles, ids_lot) for ids_lot in lots]
+                for future in as_completed(futures):
+                    ecrits += future.result()
+
+        duree = time.monotonic() - debut
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ {ecrits}/{len(ids)} article(s) pré-rendu(s) en {duree:.1f}s')
+        )
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from nimbaApp.publication import publier_articles_programmes
+
+
+class Command(BaseCommand):
+    help = 'Publie les articles programmés dont la date de publication est arrivée'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--boucle', action='store_true',
+                            help='Tourner en continu au lieu d\'un seul passage (sans cron)')
+        parser.add_argument('--intervalle', type=int, default=60,
+                            help='Secondes entre deux passages en mode boucle')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            publies = publier_articles_programmes()
+            if publies or not options['boucle']:
+                self.stdout.write(self.style.SUCCESS(f'✓ {publies} article(s) publié(s)'))
+            if not options['boucle']:
+                break
+            time.sleep(options['intervalle'])
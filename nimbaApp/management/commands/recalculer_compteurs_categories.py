@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from nimbaApp.compteurs import recalculer_toutes_categories
+
+
+class Command(BaseCommand):
+    help = 'Recalcule depuis les articles les compteurs dénormalisés des catégories (réparation en cas de dérive)'
+
+    def handle(self, *args, **options):
+        nb_categories = recalculer_toutes_categories()
+        self.stdout.write(self.style.SUCCESS(f'✓ Compteurs de {nb_categories} catégorie(s) recalculés'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from nimbaApp.plans_requetes import verifier_plans
+
+
+class Command(BaseCommand):
+    help = ('Passe à EXPLAIN les requêtes des vues et échoue si l\'une parcourt une table entière '
+            'ou trie sans index (à lancer sur une base au volume réaliste)')
+
+    def handle(self, *args, **options):
+        nb_requetes, signalements = verifier_plans()
+        for vue, sql, problemes in signalements:
+            details = ', '.join(
+                f'parcours complet de {table}' if type_probleme == 'parcours' else 'tri sans index'
+                for type_probleme, table in problemes
+            )
+            self.stdout.write(self.style.ERROR(f'✗ {vue} : {details}'))
+            self.stdout.write(f'    {sql}')
+
+        if signalements:
+            raise CommandError(f'{len(signalements)} requête(s) sur {nb_requetes} sans index adapté')
+        self.stdout.write(self.style.SUCCESS(f'✓ {nb_requetes} requête(s) analysée(s), toutes servies par un index'))
@@ -0,0 +1,71 @@
+"""
+Nettoyage des fichiers médias orphelins.
+
+Avec le stockage adressé par contenu (voir storage.py), un fichier peut être
+partagé par plusieurs articles ou publicités : il n'est donc jamais supprimé
+avec l'un d'eux. La commande `nettoyer_medias` supprime les fichiers des
+dossiers d'envoi qui ne sont plus référencés par aucune ligne. Les fichiers
+récents sont épargnés : un envoi peut être écrit sur disque avant que la
+ligne qui le référence soit enregistrée.
+"""
+import posixpath
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.db import models
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Âge minimal d'un fichier non référencé avant sa suppression
+DELAI_GRACE = timedelta(hours=24)
+
+
+def champs_fichiers():
+    """(modèle, champ) de chaque champ fichier de l'application"""
+    return [
+        (modele, champ)
+        for modele in apps.get_app_config('nimbaApp').get_models()
+        for champ in modele._meta.concrete_fields
+        if isinstance(champ, models.FileField)
+    ]
+
+
+def _parcourir(dossier):
+    """Noms (relatifs au stockage) de tous les fichiers sous un dossier"""
+    if not default_storage.exists(dossier):
+        return
+    sous_dossiers, fichiers = default_storage.listdir(dossier)
+    for fichier in fichiers:
+        yield posixpath.join(dossier, fichier)
+    for sous_dossier in sous_dossiers:
+        yield from _parcourir(posixpath.join(dossier, sous_dossier))
+
+
+def fichiers_orphelins(delai_grace=DELAI_GRACE):
+    """Fichiers des dossiers d'envoi qui ne sont référencés par aucune ligne et plus anciens que le délai"""
+    references = set()
+    dossiers = set()
+    for modele, champ in champs_fichiers():
+        references.update(modele.objects.exclude(**{champ.name: ''}).values_list(champ.name, flat=True))
+        dossiers.add(str(champ.upload_to).strip('/'))
+
+    limite = timezone.now() - delai_grace
+    for dossier in sorted(dossiers):
+        for nom in _parcourir(dossier):
+            if nom not in references and default_storage.get_modified_time(nom) < limite:
+                yield nom
+
+
+def nettoyer_medias(delai_grace=DELAI_GRACE, simulation=False):
+    """Supprime les fichiers orphelins ; renvoie (nombre de fichiers, octets libérés)"""
+    nb_fichiers = octets = 0
+    for nom in fichiers_orphelins(delai_grace):
+        octets += default_storage.size(nom)
+        nb_fichiers += 1
+        if not simulation:
+            default_storage.delete(nom)
+            logger.info(f"Média orphelin supprimé : {nom}")
+    return nb_fichiers, octets
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0002_newsletter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TendanceArticle',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='tendance', serialize=False, to='nimbaApp.article')),
+                ('score_log', models.FloatField(default=0, verbose_name='Score (log2)')),
+                ('derniere_activite', models.DateTimeField(verbose_name='Dernière activité')),
+                ('categorie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tendances', to='nimbaApp.categorie')),
+            ],
+            options={
+                'verbose_name': 'Tendance',
+                'verbose_name_plural': 'Tendances',
+                'indexes': [models.Index(fields=['derniere_activite', 'score_log'], name='tendance_activite_idx'), models.Index(fields=['categorie', 'derniere_activite', 'score_log'], name='tendance_cat_activite_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VueHoraire',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('heure', models.DateTimeField(verbose_name='Heure')),
+                ('vues', models.IntegerField(default=0, verbose_name='Vues')),
+                ('vues_comptees', models.IntegerField(default=0, verbose_name='Vues intégrées au score')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vues_horaires', to='nimbaApp.article')),
+            ],
+            options={
+                'verbose_name': 'Vues horaires',
+                'verbose_name_plural': 'Vues horaires',
+                'indexes': [models.Index(fields=['heure'], name='vue_horaire_heure_idx')],
+                'constraints': [models.UniqueConstraint(fields=('article', 'heure'), name='vue_horaire_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0003_tendances'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='publication_programmee',
+            field=models.BooleanField(default=False, help_text='Publié automatiquement à la date de publication (commande publier_articles_programmes)', verbose_name='Publication programmée'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['est_publie', 'date_publication'], name='article_publie_date_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0004_publication_programmee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleNewsletter',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='envoi_newsletter', serialize=False, to='nimbaApp.article')),
+                ('date_ajout', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Date d'ajout")),
+            ],
+            options={
+                'verbose_name': 'Article en attente de newsletter',
+                'verbose_name_plural': 'Articles en attente de newsletter',
+                'ordering': ['date_ajout'],
+            },
+        ),
+        migrations.AddField(
+            model_name='newsletter',
+            name='dernier_envoi',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Dernier envoi'),
+        ),
+        migrations.AddField(
+            model_name='newsletter',
+            name='frequence',
+            field=models.CharField(choices=[('reguliere', 'Régulière (regroupée toutes les quelques heures)'), ('quotidienne', 'Quotidienne'), ('hebdomadaire', 'Hebdomadaire')], default='reguliere', max_length=20, verbose_name="Fréquence d'envoi"),
+        ),
+    ]
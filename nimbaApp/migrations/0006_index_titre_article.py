@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0005_newsletter_digest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='titre',
+            field=models.CharField(db_index=True, max_length=200, verbose_name='Titre'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0006_index_titre_article'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['auteur', 'date_publication'], name='article_auteur_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicite',
+            index=models.Index(fields=['auteur', 'date_creation'], name='publicite_auteur_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0007_index_listes_redacteurs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['est_publie', 'est_a_la_une', 'date_publication'], name='article_publie_une_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['categorie', 'est_publie', 'date_publication'], name='article_cat_publie_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['est_actif'], name='newsletter_actif_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicite',
+            index=models.Index(fields=['position', 'est_active', 'date_creation'], name='publicite_position_active_idx'),
+        ),
+    ]
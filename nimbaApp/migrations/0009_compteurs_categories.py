@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def initialiser_compteurs(apps, schema_editor):
+    """Calcule les agrégats des catégories existantes"""
+    Article = apps.get_model('nimbaApp', 'Article')
+    Categorie = apps.get_model('nimbaApp', 'Categorie')
+    for categorie in Categorie.objects.all():
+        publies = Article.objects.filter(categorie=categorie, est_publie=True)
+        agregats = publies.aggregate(nb=Count('id'), vues=Sum('vues'))
+        dernier = publies.order_by('-date_publication', '-id').first()
+        categorie.nb_articles_publies = agregats['nb']
+        categorie.total_vues = agregats['vues'] or 0
+        categorie.dernier_article = dernier
+        categorie.date_dernier_article = dernier.date_publication if dernier else None
+        categorie.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0008_audit_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categorie',
+            name='date_dernier_article',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Date du dernier article'),
+        ),
+        migrations.AddField(
+            model_name='categorie',
+            name='dernier_article',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='nimbaApp.article', verbose_name='Dernier article publié'),
+        ),
+        migrations.AddField(
+            model_name='categorie',
+            name='nb_articles_publies',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Articles publiés'),
+        ),
+        migrations.AddField(
+            model_name='categorie',
+            name='total_vues',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Total des vues'),
+        ),
+        migrations.RunPython(initialiser_compteurs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def initialiser_archives(apps, schema_editor):
+    """Compte les articles publiés existants par catégorie et par mois"""
+    Article = apps.get_model('nimbaApp', 'Article')
+    ArchiveMois = apps.get_model('nimbaApp', 'ArchiveMois')
+    mois = (
+        Article.objects.filter(est_publie=True)
+        .annotate(annee=ExtractYear('date_publication'), mois=ExtractMonth('date_publication'))
+        .values('categorie_id', 'annee', 'mois').annotate(nb=Count('id')).order_by()
+    )
+    ArchiveMois.objects.bulk_create([
+        ArchiveMois(categorie_id=ligne['categorie_id'], annee=ligne['annee'], mois=ligne['mois'],
+                    nb_articles=ligne['nb'])
+        for ligne in mois
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0009_compteurs_categories'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveMois',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('annee', models.PositiveSmallIntegerField(verbose_name='Année')),
+                ('mois', models.PositiveSmallIntegerField(verbose_name='Mois')),
+                ('nb_articles', models.PositiveIntegerField(default=0, verbose_name='Articles publiés')),
+                ('categorie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archives', to='nimbaApp.categorie')),
+            ],
+            options={
+                'verbose_name': 'Archive mensuelle',
+                'verbose_name_plural': 'Archives mensuelles',
+                'ordering': ['-annee', '-mois'],
+                'constraints': [models.UniqueConstraint(fields=('categorie', 'annee', 'mois'), name='archive_mois_unique')],
+            },
+        ),
+        migrations.RunPython(initialiser_archives, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:02
+
+from django.db import migrations, models
+
+
+def initialiser_derniers_articles(apps, schema_editor):
+    """Retient les trois derniers articles publiés de chaque catégorie existante"""
+    Article = apps.get_model('nimbaApp', 'Article')
+    Categorie = apps.get_model('nimbaApp', 'Categorie')
+    for categorie in Categorie.objects.all():
+        categorie.derniers_articles_ids = list(
+            Article.objects.filter(categorie=categorie, est_publie=True)
+            .order_by('-date_publication', '-id').values_list('id', flat=True)[:3]
+        )
+        categorie.save(update_fields=['derniers_articles_ids'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0010_archives_mensuelles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categorie',
+            name='derniers_articles_ids',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Derniers articles publiés'),
+        ),
+        migrations.RunPython(initialiser_derniers_articles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 20:10
+
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def initialiser_vues_comptees(apps, schema_editor):
+    """
+    Vues déjà reportées : toutes, sauf celles des tranches horaires que
+    calculer_tendances n'a pas encore intégrées ; les totaux des catégories
+    sont recalculés en conséquence
+    """
+    Article = apps.get_model('nimbaApp', 'Article')
+    Categorie = apps.get_model('nimbaApp', 'Categorie')
+    VueHoraire = apps.get_model('nimbaApp', 'VueHoraire')
+    Article.objects.update(vues_comptees=F('vues'))
+    en_attente = (
+        VueHoraire.objects.filter(vues__gt=F('vues_comptees')).values('article_id')
+        .annotate(nb=Sum(F('vues') - F('vues_comptees'))).order_by()
+    )
+    for ligne in en_attente:
+        Article.objects.filter(pk=ligne['article_id']).update(vues_comptees=F('vues_comptees') - ligne['nb'])
+    for categorie in Categorie.objects.all():
+        total = Article.objects.filter(categorie=categorie, est_publie=True).aggregate(vues=Sum('vues_comptees'))
+        categorie.total_vues = total['vues'] or 0
+        categorie.save(update_fields=['total_vues'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nimbaApp', '0011_derniers_articles_categorie'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='vues_comptees',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Vues reportées sur la catégorie'),
+        ),
+        migrations.RunPython(initialiser_vues_comptees, migrations.RunPython.noop),
+    ]
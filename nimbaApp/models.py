@@ -4,9 +4,18 @@ from django.utils import timezone
 
 
 class Newsletter(models.Model):
+    FREQUENCE_CHOICES = [
+        ('reguliere', 'Régulière (regroupée toutes les quelques heures)'),
+        ('quotidienne', 'Quotidienne'),
+        ('hebdomadaire', 'Hebdomadaire'),
+    ]
+
     email = models.EmailField(unique=True, verbose_name='Email')
     date_inscription = models.DateTimeField(auto_now_add=True, verbose_name='Date d\'inscription')
     est_actif = models.BooleanField(default=True, verbose_name='Actif')
+    frequence = models.CharField(max_length=20, choices=FREQUENCE_CHOICES, default='reguliere',
+                                 verbose_name='Fréquence d\'envoi')
+    dernier_envoi = models.DateTimeField(null=True, blank=True, verbose_name='Dernier envoi')
 
     def __str__(self):
         return self.email
@@ -15,6 +24,9 @@ class Newsletter(models.Model):
         verbose_name = 'Abonné Newsletter'
         verbose_name_plural = 'Abonnés Newsletter'
         ordering = ['-date_inscription']
+        indexes = [
+            models.Index(fields=['est_actif'], name='newsletter_actif_idx'),
+        ]
 
 
 class Categorie(models.Model):
@@ -32,6 +44,16 @@ class Categorie(models.Model):
     description = models.TextField(blank=True)
     ordre = models.IntegerField(default=0, help_text="Ordre d'affichage")
 
+    # Agrégats dénormalisés, tenus à jour par les signaux (voir compteurs.py)
+    nb_articles_publies = models.PositiveIntegerField(default=0, editable=False, verbose_name='Articles publiés')
+    total_vues = models.BigIntegerField(default=0, editable=False, verbose_name='Total des vues')
+    dernier_article = models.ForeignKey('Article', on_delete=models.SET_NULL, null=True, blank=True,
+                                        editable=False, related_name='+', verbose_name='Dernier article publié')
+    date_dernier_article = models.DateTimeField(null=True, blank=True, editable=False,
+                                                verbose_name='Date du dernier article')
+    derniers_articles_ids = models.JSONField(default=list, blank=True, editable=False,
+                                             verbose_name='Derniers articles publiés')
+
     def __str__(self):
         return self.get_nom_display()
 
@@ -41,8 +63,27 @@ class Categorie(models.Model):
         ordering = ['ordre', 'nom']
 
 
+class ArchiveMois(models.Model):
+    """Nombre d'articles publiés d'une catégorie sur un mois (maintenu par compteurs.py)"""
+    categorie = models.ForeignKey(Categorie, on_delete=models.CASCADE, related_name='archives')
+    annee = models.PositiveSmallIntegerField(verbose_name='Année')
+    mois = models.PositiveSmallIntegerField(verbose_name='Mois')
+    nb_articles = models.PositiveIntegerField(default=0, verbose_name='Articles publiés')
+
+    def __str__(self):
+        return f"{self.categorie_id} {self.annee}-{self.mois:02d} : {self.nb_articles}"
+
+    class Meta:
+        verbose_name = 'Archive mensuelle'
+        verbose_name_plural = 'Archives mensuelles'
+        ordering = ['-annee', '-mois']
+        constraints = [
+            models.UniqueConstraint(fields=['categorie', 'annee', 'mois'], name='archive_mois_unique'),
+        ]
+
+
 class Article(models.Model):
-    titre = models.CharField(max_length=200, verbose_name='Titre')
+    titre = models.CharField(max_length=200, db_index=True, verbose_name='Titre')
     sous_titre = models.CharField(max_length=300, blank=True, verbose_name='Sous-titre')
     contenu = models.TextField(verbose_name='Contenu')
     image = models.ImageField(upload_to='articles/', blank=True, null=True, verbose_name='Image')
@@ -53,7 +94,13 @@ class Article(models.Model):
     date_modification = models.DateTimeField(auto_now=True, verbose_name='Dernière modification')
     est_publie = models.BooleanField(default=True, verbose_name='Publié')
     est_a_la_une = models.BooleanField(default=False, verbose_name='À la une')
+    publication_programmee = models.BooleanField(
+        default=False, verbose_name='Publication programmée',
+        help_text="Publié automatiquement à la date de publication (commande publier_articles_programmes)"
+    )
     vues = models.IntegerField(default=0, verbose_name='Nombre de vues')
+    # Part de `vues` déjà reportée sur Categorie.total_vues (voir compteurs)
+    vues_comptees = models.IntegerField(default=0, editable=False, verbose_name='Vues reportées sur la catégorie')
 
     def __str__(self):
         return self.titre
@@ -62,6 +109,13 @@ class Article(models.Model):
         ordering = ['-date_publication']
         verbose_name = 'Article'
         verbose_name_plural = 'Articles'
+        indexes = [
+            models.Index(fields=['est_publie', 'date_publication'], name='article_publie_date_idx'),
+            models.Index(fields=['auteur', 'date_publication'], name='article_auteur_date_idx'),
+            # Accueil (article à la une) et pages de rubrique / articles similaires
+            models.Index(fields=['est_publie', 'est_a_la_une', 'date_publication'], name='article_publie_une_date_idx'),
+            models.Index(fields=['categorie', 'est_publie', 'date_publication'], name='article_cat_publie_date_idx'),
+        ]
 
 
 class Publicite(models.Model):
@@ -95,4 +149,70 @@ class Publicite(models.Model):
     class Meta:
         ordering = ['-date_creation']
         verbose_name = 'Publicité'
-        verbose_name_plural = 'Publicités'
\ No newline at end of file
+        verbose_name_plural = 'Publicités'
+        indexes = [
+            models.Index(fields=['auteur', 'date_creation'], name='publicite_auteur_date_idx'),
+            # Publicités actives d'un emplacement, dans l'ordre de Meta.ordering
+            models.Index(fields=['position', 'est_active', 'date_creation'], name='publicite_position_active_idx'),
+        ]
+
+
+class VueHoraire(models.Model):
+    """Nombre de lectures d'un article sur une heure (fenêtre glissante des tendances)"""
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='vues_horaires')
+    heure = models.DateTimeField(verbose_name='Heure')
+    vues = models.IntegerField(default=0, verbose_name='Vues')
+    vues_comptees = models.IntegerField(default=0, verbose_name='Vues intégrées au score')
+
+    def __str__(self):
+        return f"{self.article_id} @ {self.heure:%Y-%m-%d %H:00} : {self.vues}"
+
+    class Meta:
+        verbose_name = 'Vues horaires'
+        verbose_name_plural = 'Vues horaires'
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'heure'], name='vue_horaire_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['heure'], name='vue_horaire_heure_idx'),
+        ]
+
+
+class TendanceArticle(models.Model):
+    """
+    Score de tendance d'un article, décroissant avec le temps.
+    Le score est stocké en log2 relativement à une date de référence fixe :
+    l'ordre des articles sans nouvelle lecture ne change donc pas avec le
+    temps, et seuls les articles ayant de nouvelles vues sont mis à jour.
+    """
+    article = models.OneToOneField(Article, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='tendance')
+    categorie = models.ForeignKey(Categorie, on_delete=models.CASCADE, related_name='tendances')
+    score_log = models.FloatField(default=0, verbose_name='Score (log2)')
+    derniere_activite = models.DateTimeField(verbose_name='Dernière activité')
+
+    def __str__(self):
+        return f"{self.article_id} : {self.score_log:.2f}"
+
+    class Meta:
+        verbose_name = 'Tendance'
+        verbose_name_plural = 'Tendances'
+        indexes = [
+            models.Index(fields=['derniere_activite', 'score_log'], name='tendance_activite_idx'),
+            models.Index(fields=['categorie', 'derniere_activite', 'score_log'], name='tendance_cat_activite_idx'),
+        ]
+
+
+class ArticleNewsletter(models.Model):
+    """Article publié en attente du prochain envoi groupé de la newsletter"""
+    article = models.OneToOneField(Article, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='envoi_newsletter')
+    date_ajout = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Date d\'ajout')
+
+    def __str__(self):
+        return f"{self.article_id} ({self.date_ajout:%Y-%m-%d %H:%M})"
+
+    class Meta:
+        verbose_name = 'Article en attente de newsletter'
+        verbose_name_plural = 'Articles en attente de newsletter'
+        ordering = ['date_ajout']
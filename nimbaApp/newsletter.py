@@ -0,0 +1,107 @@
+"""
+Envoi groupé (digest) de la newsletter.
+
+À la publication, un article est simplement ajouté à la file d'attente
+(ArticleNewsletter). La commande `envoyer_newsletter`, lancée régulièrement
+par cron, envoie à chaque abonné dont la fréquence le permet un seul email
+présentant tous les articles publiés depuis son dernier envoi.
+
+Les abonnés qui doivent recevoir exactement les mêmes articles reçoivent le
+même email, rendu une fois puis envoyé par lots en copie cachée sur une seule
+connexion SMTP.
+"""
+from bisect import bisect_right
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.utils import timezone
+from .email_utils import envoyer_newsletter_nouvel_article, preparer_digest_newsletter
+from .models import ArticleNewsletter, Newsletter
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Délai minimal entre deux envois à un même abonné, selon sa fréquence
+DELAIS_FREQUENCE = {
+    'reguliere': timedelta(hours=settings.NEWSLETTER_FENETRE_DIGEST),
+    'quotidienne': timedelta(days=1),
+    'hebdomadaire': timedelta(days=7),
+}
+
+# Marge tolérée sur ces délais : un passage de cron légèrement en avance
+# ne doit pas repousser l'envoi au passage suivant
+MARGE_ENVOI = timedelta(minutes=5)
+
+
+def annoncer_article(article):
+    """
+    Annonce un article qui vient d'être publié : en mode digest, il est mis en
+    file pour le prochain envoi groupé (renvoie None) ; sinon la newsletter est
+    envoyée immédiatement (renvoie le nombre d'abonnés destinataires).
+    """
+    if settings.NEWSLETTER_MODE_DIGEST:
+        ArticleNewsletter.objects.get_or_create(article=article)
+        return None
+    return envoyer_newsletter_nouvel_article(article)
+
+
+def _abonnes_a_servir(file_attente, maintenant):
+    """
+    Regroupe les abonnés dont le délai est écoulé selon la position, dans la
+    file, du premier article qu'ils n'ont pas encore reçu
+    """
+    dates_ajout = [entree.date_ajout for entree in file_attente]
+    groupes = {}
+    abonnes = Newsletter.objects.filter(est_actif=True).only(
+        'id', 'email', 'frequence', 'dernier_envoi', 'date_inscription'
+    )
+    for abonne in abonnes.iterator():
+        if abonne.dernier_envoi:
+            delai = DELAIS_FREQUENCE.get(abonne.frequence, DELAIS_FREQUENCE['reguliere'])
+            if maintenant - abonne.dernier_envoi < delai - MARGE_ENVOI:
+                continue
+        debut = bisect_right(dates_ajout, abonne.dernier_envoi or abonne.date_inscription)
+        if debut < len(file_attente):
+            groupes.setdefault(debut, []).append(abonne)
+    return groupes
+
+
+def envoyer_digests(maintenant=None):
+    """
+    Envoie les emails groupés dus et purge la file.
+    Renvoie (nombre d'emails envoyés, nombre d'abonnés servis).
+    """
+    maintenant = maintenant or timezone.now()
+    file_attente = list(
+        ArticleNewsletter.objects.filter(date_ajout__lte=maintenant, article__est_publie=True)
+        .select_related('article__categorie', 'article__auteur')
+        .order_by('date_ajout')
+    )
+    nb_emails = nb_abonnes = 0
+    if file_attente:
+        taille_lot = settings.NEWSLETTER_TAILLE_LOT
+        with get_connection() as connexion:
+            for debut, abonnes in _abonnes_a_servir(file_attente, maintenant).items():
+                # Les plus récents en premier
+                articles = [entree.article for entree in reversed(file_attente[debut:])]
+                email = preparer_digest_newsletter(articles, [], connexion)
+                for i in range(0, len(abonnes), taille_lot):
+                    lot = abonnes[i:i + taille_lot]
+                    email.bcc = [abonne.email for abonne in lot]
+                    try:
+                        email.send()
+                    except Exception as e:
+                        # Le lot sera retenté au prochain passage
+                        logger.error(f"Erreur lors de l'envoi d'un lot de la newsletter : {str(e)}")
+                        continue
+                    Newsletter.objects.filter(id__in=[abonne.id for abonne in lot]).update(dernier_envoi=maintenant)
+                    nb_emails += 1
+                    nb_abonnes += len(lot)
+
+    # Tous les abonnés ont été servis au bout du délai le plus long
+    limite = maintenant - max(DELAIS_FREQUENCE.values()) - timedelta(days=1)
+    ArticleNewsletter.objects.filter(date_ajout__lt=limite).delete()
+
+    logger.info(f"Newsletter groupée : {nb_emails} email(s) envoyé(s) à {nb_abonnes} abonné(s)")
+    return nb_emails, nb_abonnes
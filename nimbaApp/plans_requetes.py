@@ -0,0 +1,196 @@
+"""
+Vérification des plans d'exécution des requêtes des vues.
+
+Chaque vue est appelée avec une requête fabriquée, adressée au domaine du
+site (SITE_URL), sans passer par les caches (fonctions de vue nues) ; les
+SELECT qu'elle exécute sont capturés puis passés à EXPLAIN. Un plan est
+signalé s'il parcourt entièrement une table ou s'il trie les lignes sans
+index (filesort).
+
+Le résultat ne doit pas dépendre de l'état du cache au lancement : les
+classements (tendances, plus lus) sont calculés avant la capture, comme le
+fait cron en production, les vues n'en lisant que le cache ; les totaux en
+cache des listes d'un rédacteur sont rendus obsolètes avant chaque vue pour
+que leurs COUNT soient toujours analysés.
+
+Les plans dépendent du volume : à lancer sur une base réaliste (copie de la
+production). Sur PostgreSQL, les parcours séquentiels et les tris sont
+désactivés pendant l'analyse pour que le planificateur révèle les index
+manquants même sur une petite base. Sur SQLite, Django écrit les filtres
+booléens sans comparaison (WHERE "est_publie"), forme pour laquelle SQLite
+n'utilise aucun index : ils sont réécrits en « = 1 », comme sur MySQL, avant
+l'analyse.
+"""
+import inspect
+import json
+import re
+from urllib.parse import urlsplit
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.db import connection, models, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from . import api, archives, views
+from .cache_utils import changer_version_listes
+from .models import ArchiveMois, Article, Categorie
+from .tendances import calculer_classements
+
+# Petites tables de référence : un parcours complet y est normal
+TABLES_NEGLIGEABLES = {Categorie._meta.db_table, ArchiveMois._meta.db_table}
+
+
+def vues_a_verifier():
+    """(nom, chemin, vue, arguments, utilisateur) pour chaque vue à analyser"""
+    categorie = Categorie.objects.first()
+    article = Article.objects.filter(est_publie=True).first()
+    redacteur = User.objects.filter(is_staff=True).first()
+
+    cibles = [
+        ('home', '/', views._home, {}, None),
+        ('flux_rss', '/flux/rss/', views.flux_rss, {}, None),
+        ('sitemap_articles', '/sitemap-articles.xml', views.sitemap_section, {'section': 'articles'}, None),
+        ('api_articles', '/api/v1/articles/', api.liste_articles, {}, None),
+    ]
+    cibles += [
+        (f'emplacement_publicite:{position}', f'/publicites/{position}/',
+         lambda request, position=position: list(views.publicites_actives(position)), {}, None)
+        for position in views.NB_PUBLICITES_PAR_POSITION
+    ]
+    if categorie:
+        cibles.append(('categorie_view', f'/categorie/{categorie.nom}/', views._categorie_view,
+                       {'categorie': categorie.nom}, None))
+    if article:
+        cibles.append(('article_detail', f'/article/{article.id}/', views._article_detail, {'id': article.id}, None))
+        date = timezone.localtime(article.date_publication)
+        cibles += [
+            ('archives_mois', f'/archives/{date.year}/{date.month}/', archives._archives,
+             {'annee': date.year, 'mois': date.month, 'categorie': None, 'curseur': ''}, None),
+            ('archives_categorie_annee', f'/categorie/{article.categorie.nom}/archives/{date.year}/',
+             archives._archives,
+             {'annee': date.year, 'mois': None, 'categorie': article.categorie.nom, 'curseur': ''}, None),
+        ]
+    if redacteur:
+        aujourdhui = timezone.localdate().isoformat()
+        cibles += [
+            ('dashboard', '/dashboard/', views.dashboard, {}, redacteur),
+            ('liste_articles', '/liste-articles/', views.liste_articles, {}, redacteur),
+            ('liste_publicites', '/liste-publicites/', views.liste_publicites, {}, redacteur),
+            ('liste_publicites_periode', f'/liste-publicites/?du={aujourdhui}&au={aujourdhui}',
+             views.liste_publicites, {}, redacteur),
+        ]
+    return cibles
+
+
+def capturer_requetes(chemin, vue, arguments, utilisateur=None):
+    """SELECT exécutés par une vue, décorateurs (cache, authentification) retirés"""
+    url = urlsplit(settings.SITE_URL)
+    requete = RequestFactory().get(chemin, HTTP_HOST=url.netloc, secure=url.scheme == 'https')
+    requete.user = utilisateur or AnonymousUser()
+    with CaptureQueriesContext(connection) as capture:
+        reponse = inspect.unwrap(vue)(requete, **arguments)
+        if hasattr(reponse, 'render') and callable(reponse.render):
+            reponse.render()
+    return [
+        requete_sql['sql'] for requete_sql in capture.captured_queries
+        if requete_sql['sql'].lstrip().upper().startswith('SELECT')
+    ]
+
+
+def table_principale(sql):
+    correspondance = re.search(r'\bFROM\s+[`"]?(\w+)[`"]?', sql)
+    return correspondance.group(1) if correspondance else None
+
+
+def _comparer_booleens(sql):
+    """Réécrit les filtres booléens nus de la clause WHERE en comparaisons explicites (SQLite)"""
+    debut = sql.find(' WHERE ')
+    if debut == -1:
+        return sql
+    colonnes = [
+        f'"{modele._meta.db_table}"."{champ.column}"'
+        for modele in apps.get_app_config('nimbaApp').get_models()
+        for champ in modele._meta.concrete_fields
+        if isinstance(champ, models.BooleanField)
+    ]
+    clause = sql[debut:]
+    for colonne in colonnes:
+        clause = re.sub(re.escape(colonne) + r'(?!\s*(=|<|>|!|IS\b|IN\b))', colonne + ' = 1', clause)
+    return sql[:debut] + clause
+
+
+def expliquer(sql):
+    """Lignes renvoyées par EXPLAIN pour une requête SQL"""
+    if connection.vendor == 'sqlite':
+        sql = _comparer_booleens(sql)
+    if connection.vendor == 'mysql':
+        prefixe = connection.ops.explain_query_prefix(format='json')
+    else:
+        prefixe = connection.ops.explain_query_prefix()
+    with transaction.atomic(), connection.cursor() as curseur:
+        if connection.vendor == 'postgresql':
+            curseur.execute('SET LOCAL enable_seqscan = off')
+            curseur.execute('SET LOCAL enable_sort = off')
+        curseur.execute(f'{prefixe} {sql}')
+        return curseur.fetchall()
+
+
+def _problemes_mysql(noeud, problemes):
+    if isinstance(noeud, dict):
+        if noeud.get('access_type') == 'ALL':
+            problemes.append(('parcours', noeud.get('table_name')))
+        if noeud.get('using_filesort'):
+            problemes.append(('tri', None))
+        for valeur in noeud.values():
+            _problemes_mysql(valeur, problemes)
+    elif isinstance(noeud, list):
+        for valeur in noeud:
+            _problemes_mysql(valeur, problemes)
+
+
+def problemes_plan(lignes):
+    """Liste de (type, table) : 'parcours' pour un parcours complet, 'tri' pour un tri sans index"""
+    problemes = []
+    if connection.vendor == 'mysql':
+        _problemes_mysql(json.loads(lignes[0][0]), problemes)
+    elif connection.vendor == 'postgresql':
+        texte = '\n'.join(ligne[0] for ligne in lignes)
+        problemes += [('parcours', table) for table in re.findall(r'Seq Scan on "?(\w+)"?', texte)]
+        if re.search(r'^\s*(->\s+)?Sort\b', texte, re.MULTILINE):
+            problemes.append(('tri', None))
+    else:
+        for ligne in lignes:
+            detail = ligne[-1]
+            correspondance = re.match(r'SCAN (\w+)$', detail)
+            if correspondance:
+                problemes.append(('parcours', correspondance.group(1)))
+            if 'USE TEMP B-TREE' in detail:
+                problemes.append(('tri', None))
+    return [
+        (type_probleme, table) for type_probleme, table in problemes
+        if table not in TABLES_NEGLIGEABLES
+    ]
+
+
+def verifier_plans():
+    """
+    Analyse les requêtes de toutes les vues.
+    Renvoie (nombre de requêtes analysées, liste de (vue, sql, problèmes)).
+    """
+    nb_requetes = 0
+    signalements = []
+    # Requêtes de la commande calculer_tendances (cron), hors du chemin des vues
+    calculer_classements()
+    for nom, chemin, vue, arguments, utilisateur in vues_a_verifier():
+        if utilisateur is not None:
+            changer_version_listes(utilisateur.id)
+        for sql in capturer_requetes(chemin, vue, arguments, utilisateur):
+            if table_principale(sql) in TABLES_NEGLIGEABLES:
+                continue
+            nb_requetes += 1
+            problemes = problemes_plan(expliquer(sql))
+            if problemes:
+                signalements.append((nom, sql, problemes))
+    return nb_requetes, signalements
@@ -0,0 +1,151 @@
+"""
+Préchauffage des caches après un déploiement ou une publication.
+
+Les pages sont construites directement par les fonctions de vue, avec une
+requête anonyme fabriquée (RequestFactory) : le compteur de vues des articles
+n'est donc pas incrémenté. Les clés déjà fraîches ne sont pas recalculées,
+les clés absentes ou périmées le sont une seule fois (voir CacheDeuxNiveaux).
+
+Les pages construites sont rangées dans le cache partagé (Redis) : c'est ce
+qui les rend utiles aux workers quand le préchauffage tourne dans une commande
+ou dans un autre worker. Avec un cache propre au processus, la commande
+prechauffer_cache refuse de s'exécuter.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.test import RequestFactory
+from .cache_utils import cache_pages
+from .models import Article, Categorie
+from .tendances import obtenir_classements
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'articles récents et d'articles les plus lus préchauffés
+NB_ARTICLES_PRECHAUFFES = 20
+
+# Threads du processus consacrés au préchauffage après enregistrement d'un article
+NB_THREADS_ARRIERE_PLAN = 2
+
+_executeur_arriere_plan = ThreadPoolExecutor(max_workers=NB_THREADS_ARRIERE_PLAN,
+                                             thread_name_prefix='prechauffage')
+_articles_en_attente = set()
+_verrou_attente = threading.Lock()
+
+
+def _requete(chemin):
+    """Requête GET anonyme adressée au domaine public du site"""
+    url = urlsplit(settings.SITE_URL)
+    requete = RequestFactory().get(
+        chemin,
+        HTTP_HOST=url.netloc,
+        secure=url.scheme == 'https',
+    )
+    requete.user = AnonymousUser()
+    return requete
+
+
+def cibles_pages(categories=None, article_ids=None):
+    """Pages à préchauffer : (clé du cache des pages, fonction de construction)"""
+    # Import local : ce module est chargé par les signaux, au démarrage, avant les vues
+    from . import views
+
+    cibles = [('home', lambda: views._home(_requete('/')))]
+    for nom in categories or []:
+        cibles.append((f'categorie:{nom}', lambda nom=nom: views._categorie_view(_requete(f'/categorie/{nom}/'), nom)))
+    for article_id in article_ids or []:
+        cibles.append((f'article:{article_id}',
+                       lambda article_id=article_id: views._article_detail(_requete(f'/article/{article_id}/'), article_id)))
+    return cibles
+
+
+def _executer(tache):
+    """Exécute une tâche dans un thread puis ferme ses connexions à la base"""
+    try:
+        tache()
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors du préchauffage : {str(e)}")
+        return False
+    finally:
+        connections.close_all()
+
+
+def prechauffer(nb_articles=NB_ARTICLES_PRECHAUFFES, nb_threads=4, avec_flux=True):
+    """
+    Préchauffe les pages (accueil, rubriques, articles récents et les plus lus),
+    les fragments publicitaires, les classements et, si demandé, les flux et sitemaps.
+    Renvoie (nombre de tâches réussies, nombre de tâches, durée en secondes).
+    """
+    from . import views
+
+    debut = time.monotonic()
+    publies = Article.objects.filter(est_publie=True)
+    article_ids = list(publies.order_by('-date_publication').values_list('id', flat=True)[:nb_articles])
+    article_ids += [
+        article_id
+        for article_id in publies.order_by('-vues').values_list('id', flat=True)[:nb_articles]
+        if article_id not in article_ids
+    ]
+    categories = list(Categorie.objects.values_list('nom', flat=True))
+
+    taches = [
+        lambda cle=cle, construire=construire: cache_pages.obtenir(cle, lambda: construire().content)
+        for cle, construire in cibles_pages(categories, article_ids)
+    ]
+    taches += [
+        lambda position=position: views.donnees_emplacement(position)
+        for position in views.NB_PUBLICITES_PAR_POSITION
+    ]
+    taches.append(obtenir_classements)
+    if avec_flux:
+        taches += [
+            lambda: views.flux_rss(_requete('/flux/rss/')),
+            lambda: views.flux_atom(_requete('/flux/atom/')),
+            lambda: views.sitemap_index(_requete('/sitemap.xml')),
+        ]
+        taches += [
+            lambda nom=nom: views.flux_rss(_requete(f'/categorie/{nom}/rss/'), categorie=nom)
+            for nom in categories
+        ]
+
+    with ThreadPoolExecutor(max_workers=max(1, nb_threads)) as executeur:
+        resultats = list(executeur.map(_executer, taches))
+
+    duree = time.monotonic() - debut
+    logger.info(f"Cache préchauffé : {sum(resultats)}/{len(taches)} tâches en {duree:.2f}s")
+    return sum(resultats), len(taches), duree
+
+
+def prechauffer_article(article_id):
+    """Après une publication : reconstruit l'accueil, la rubrique et la page de l'article"""
+    article = Article.objects.select_related('categorie').filter(id=article_id, est_publie=True).first()
+    if article is None:
+        return
+    for cle, construire in cibles_pages([article.categorie.nom], [article.id]):
+        cache_pages.obtenir(cle, lambda construire=construire: construire().content)
+
+
+def _prechauffer_article_en_attente(article_id):
+    with _verrou_attente:
+        _articles_en_attente.discard(article_id)
+    _executer(lambda: prechauffer_article(article_id))
+
+
+def prechauffer_article_en_arriere_plan(article_id):
+    """
+    Confie prechauffer_article au pool de threads du processus pour ne pas
+    ralentir la requête de l'éditeur ; un article déjà en attente n'est pas ajouté
+    une seconde fois
+    """
+    with _verrou_attente:
+        if article_id in _articles_en_attente:
+            return
+        _articles_en_attente.add(article_id)
+    _executeur_arriere_plan.submit(_prechauffer_article_en_attente, article_id)
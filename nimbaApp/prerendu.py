@@ -0,0 +1,110 @@
+"""
+Pré-rendu statique des articles publiés.
+
+Chaque article publié est rendu sur disque sous
+PRERENDU_ROOT/articles/<id>/<version>.html, la version étant l'horodatage de
+sa dernière modification, et la version courante est recopiée de façon
+atomique dans PRERENDU_ROOT/articles/<id>/index.html. Le serveur web peut
+ainsi servir les lectures directement, par exemple avec nginx :
+
+    location ~ ^/article/(\\d+)/$ {
+        try_files /prerendu/articles/$1/index.html @django;
+    }
+
+Le compteur de vues n'est pas figé dans la page : un petit script appelle
+`article_vue` à chaque lecture.
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from .context_processors import assets
+from .models import Article
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Nombre de versions conservées par article (la courante et les précédentes)
+NB_VERSIONS_CONSERVEES = 3
+
+
+def dossier_article(article_id):
+    """Dossier contenant les versions pré-rendues d'un article"""
+    return Path(settings.PRERENDU_ROOT) / 'articles' / str(article_id)
+
+
+def _ecrire_atomiquement(chemin, contenu):
+    """Écrit un fichier via un fichier temporaire puis un renommage atomique"""
+    descripteur, temporaire = tempfile.mkstemp(dir=chemin.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(descripteur, 'w', encoding='utf-8') as fichier:
+            fichier.write(contenu)
+        os.chmod(temporaire, 0o644)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.unlink(temporaire)
+        raise
+
+
+def supprimer_prerendu(article_id):
+    """Supprime les pages pré-rendues d'un article (dépublié ou supprimé)"""
+    shutil.rmtree(dossier_article(article_id), ignore_errors=True)
+
+
+def prerendre_article(article_id):
+    """
+    Rend la page d'un article publié sur disque.
+    Renvoie le chemin de la version écrite, ou None si l'article n'est pas publié.
+    """
+    # Import local : les signaux chargent ce module au démarrage, avant les vues
+    from .views import contexte_article_detail
+
+    if not getattr(settings, 'PRERENDU_ACTIF', False):
+        return None
+
+    article = Article.objects.select_related('categorie', 'auteur').filter(
+        id=article_id, est_publie=True
+    ).first()
+    if article is None:
+        supprimer_prerendu(article_id)
+        return None
+
+    contexte = contexte_article_detail(article)
+    contexte['rendu_statique'] = True
+    # Rendu sans requête : les processeurs de contexte ne sont pas appelés
+    contexte.update(assets(None))
+    # Pas de jeton CSRF dans une page partagée par tous les visiteurs
+    contexte['csrf_token'] = 'NOTPROVIDED'
+    html = render_to_string('article_detail.html', contexte)
+
+    dossier = dossier_article(article.id)
+    dossier.mkdir(parents=True, exist_ok=True)
+    version = int(article.date_modification.timestamp())
+    chemin_version = dossier / f'{version}.html'
+
+    _ecrire_atomiquement(chemin_version, html)
+    _ecrire_atomiquement(dossier / 'index.html', html)
+
+    # Nettoyer les anciennes versions
+    versions = sorted(dossier.glob('[0-9]*.html'), key=lambda p: int(p.stem), reverse=True)
+    for ancienne in versions[NB_VERSIONS_CONSERVEES:]:
+        ancienne.unlink(missing_ok=True)
+
+    logger.info(f"Article {article.id} pré-rendu ({chemin_version})")
+    return chemin_version
+
+
+def prerendre_articles(article_ids):
+    """Pré-rend une liste d'articles ; utilisé par les processus de la commande de reconstruction"""
+    ecrits = 0
+    for article_id in article_ids:
+        try:
+            if prerendre_article(article_id):
+                ecrits += 1
+        except Exception as e:
+            logger.error(f"Erreur lors du pré-rendu de l'article {article_id}: {str(e)}")
+    return ecrits
@@ -0,0 +1,215 @@
+"""
+Profilage à la demande des requêtes du staff, en production.
+
+Une requête est profilée quand elle porte un jeton signé, en paramètre
+(?profiler=<jeton>) ou en en-tête (X-Nimba-Profiler: <jeton>), et qu'elle
+émane du membre du staff à qui ce jeton a été délivré (voir le dashboard).
+La vue s'exécute alors sous cProfile ; le profil, l'URL, la durée et le
+nombre de requêtes SQL sont écrits dans PROFILAGE_ROOT, commun à tous les
+workers du serveur (les plus anciens profils sont écartés), consultables et
+téléchargeables depuis le dashboard quel que soit le worker qui les sert.
+
+Les pages publiques ne sont jamais servies depuis le cache aux utilisateurs
+connectés (voir page_en_cache) : le profil couvre donc toute la construction
+de la page, requêtes SQL, filtres et rendu des gabarits compris.
+"""
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+PARAMETRE_PROFILAGE = 'profiler'
+ENTETE_PROFILAGE = 'HTTP_X_NIMBA_PROFILER'
+SEL_JETON = 'nimbaApp.profilage'
+
+# Identifiant d'un profil (uuid4 hexadécimal), aussi nom de ses fichiers
+FORMAT_ID_PROFIL = re.compile(r'^[0-9a-f]{32}$')
+
+# Nombre de lignes du rapport texte (fonctions triées par temps cumulé)
+NB_LIGNES_RAPPORT = 40
+
+# Un seul profilage à la fois par processus : deux profileurs actifs en même
+# temps se gênent, et le coût doit rester borné en production
+_verrou_profilage = threading.Lock()
+
+
+def creer_jeton(user):
+    """Jeton de profilage signé, propre à un membre du staff"""
+    return signing.dumps(user.id, salt=SEL_JETON)
+
+
+def jeton_valide(jeton, user):
+    """Vérifie la signature, l'âge du jeton et qu'il appartient bien à l'utilisateur connecté"""
+    if not jeton or not user.is_authenticated or not user.is_staff:
+        return False
+    try:
+        user_id = signing.loads(jeton, salt=SEL_JETON, max_age=settings.PROFILAGE_DUREE_JETON)
+    except signing.BadSignature:
+        return False
+    return user_id == user.id
+
+
+def _dossier_profils():
+    return Path(settings.PROFILAGE_ROOT)
+
+
+def _ecrire_atomiquement(chemin, contenu):
+    """Écrit un fichier via un fichier temporaire puis un renommage atomique"""
+    descripteur, temporaire = tempfile.mkstemp(dir=chemin.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(descripteur, 'wb') as fichier:
+            fichier.write(contenu)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.unlink(temporaire)
+        raise
+
+
+def _lire_resume(chemin):
+    """Résumé et rapport d'un profil (fichier <id>.json), ou None s'il a disparu entre-temps"""
+    try:
+        resume = json.loads(chemin.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    resume['date'] = parse_datetime(resume['date'])
+    return resume
+
+
+def _date_fichier(chemin):
+    try:
+        return chemin.stat().st_mtime
+    except FileNotFoundError:
+        return 0
+
+
+def _supprimer_profil(profil_id):
+    for extension in ('.json', '.prof'):
+        (_dossier_profils() / f"{profil_id}{extension}").unlink(missing_ok=True)
+
+
+def enregistrer_profil(resume, donnees, rapport):
+    """Écrit un profil sur disque puis écarte les plus anciens et les expirés"""
+    dossier = _dossier_profils()
+    dossier.mkdir(parents=True, exist_ok=True)
+    # Le .json, lu par liste_profils, n'apparaît qu'une fois les données écrites
+    _ecrire_atomiquement(dossier / f"{resume['id']}.prof", donnees)
+    entree = dict(resume, date=resume['date'].isoformat(), rapport=rapport)
+    _ecrire_atomiquement(dossier / f"{resume['id']}.json", json.dumps(entree).encode('utf-8'))
+
+    limite = time.time() - settings.PROFILAGE_DUREE_CONSERVATION
+    fichiers = sorted(dossier.glob('*.json'), key=_date_fichier, reverse=True)
+    for rang, chemin in enumerate(fichiers):
+        if rang >= settings.PROFILAGE_TAILLE_TAMPON or _date_fichier(chemin) < limite:
+            _supprimer_profil(chemin.stem)
+
+
+def liste_profils():
+    """Profils conservés, du plus récent au plus ancien"""
+    limite = time.time() - settings.PROFILAGE_DUREE_CONSERVATION
+    profils = []
+    for chemin in _dossier_profils().glob('*.json'):
+        if _date_fichier(chemin) >= limite:
+            resume = _lire_resume(chemin)
+            if resume is not None:
+                resume.pop('rapport', None)
+                profils.append(resume)
+    return sorted(profils, key=lambda profil: profil['date'], reverse=True)
+
+
+def obtenir_profil(profil_id):
+    """(résumé, {'donnees', 'rapport'}) d'un profil, ou (None, None) s'il a été écarté"""
+    if not FORMAT_ID_PROFIL.match(profil_id):
+        return None, None
+    chemin = _dossier_profils() / f"{profil_id}.json"
+    if _date_fichier(chemin) < time.time() - settings.PROFILAGE_DUREE_CONSERVATION:
+        return None, None
+    resume = _lire_resume(chemin)
+    if resume is None:
+        return None, None
+    try:
+        donnees = (_dossier_profils() / f"{profil_id}.prof").read_bytes()
+    except OSError:
+        return None, None
+    return resume, {'donnees': donnees, 'rapport': resume.pop('rapport')}
+
+
+def profiler(request, get_response):
+    """Exécute la requête sous cProfile et enregistre le profil"""
+    requetes_sql = []
+
+    def mesurer_sql(execute, sql, params, many, context):
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            requetes_sql.append(time.perf_counter() - debut)
+
+    profileur = cProfile.Profile()
+    debut = time.perf_counter()
+    with connection.execute_wrapper(mesurer_sql):
+        profileur.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profileur.disable()
+    duree = time.perf_counter() - debut
+
+    statistiques = pstats.Stats(profileur, stream=io.StringIO())
+    statistiques.sort_stats('cumulative').print_stats(NB_LIGNES_RAPPORT)
+    resume = {
+        'id': uuid.uuid4().hex,
+        'url': request.get_full_path(),
+        'methode': request.method,
+        'statut': response.status_code,
+        'utilisateur': request.user.get_username(),
+        'date': timezone.now(),
+        'duree_ms': round(duree * 1000, 1),
+        'nb_requetes_sql': len(requetes_sql),
+        'duree_sql_ms': round(sum(requetes_sql) * 1000, 1),
+    }
+    # Format de pstats.dump_stats : lisible par pstats, snakeviz, etc.
+    enregistrer_profil(resume, marshal.dumps(statistiques.stats), statistiques.stream.getvalue())
+    logger.info(f"Requête profilée : {resume['url']} en {resume['duree_ms']} ms "
+                f"({resume['nb_requetes_sql']} requêtes SQL)")
+
+    response['X-Nimba-Profil'] = resume['id']
+    return response
+
+
+class ProfilageMiddleware:
+    """Profile les requêtes du staff portant un jeton de profilage valide"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PROFILAGE_ACTIF:
+            return self.get_response(request)
+        jeton = request.GET.get(PARAMETRE_PROFILAGE) or request.META.get(ENTETE_PROFILAGE)
+        if not jeton or not jeton_valide(jeton, request.user):
+            return self.get_response(request)
+        if not _verrou_profilage.acquire(blocking=False):
+            logger.warning(f"Profilage ignoré, un autre est en cours : {request.get_full_path()}")
+            return self.get_response(request)
+        try:
+            return profiler(request, self.get_response)
+        finally:
+            _verrou_profilage.release()
@@ -0,0 +1,79 @@
+"""
+Publication programmée des articles.
+
+Un article programmé est enregistré avec est_publie=False,
+publication_programmee=True et sa date de publication future. La commande
+`publier_articles_programmes` (cron, ou en boucle avec --boucle) publie ceux
+dont la date est arrivée : l'index (est_publie, date_publication) permet de
+les trouver sans parcourir la table.
+"""
+from django.db import transaction
+from django.utils import timezone
+from .cache_utils import changer_version_listes
+from .compteurs import articles_modifies, etats_articles
+from .models import Article
+from .newsletter import annoncer_article
+from .prechauffage import prechauffer_article
+from .prerendu import prerendre_article
+from .signals import invalider_pages_article
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def articles_a_publier(maintenant=None):
+    """Articles programmés dont la date de publication est arrivée"""
+    return Article.objects.filter(
+        est_publie=False,
+        date_publication__lte=maintenant or timezone.now(),
+        publication_programmee=True,
+    ).order_by('date_publication')
+
+
+def publier_article_programme(article):
+    """
+    Publie un article programmé. Renvoie False s'il a déjà été publié
+    (par exemple par une autre instance de la commande).
+
+    Après le commit, la page est pré-rendue, puis les pages du cache partagé
+    sont invalidées et reconstruites, avant l'annonce dans la newsletter : la
+    commande tourne hors des workers, qui ne voient ces invalidations que si
+    le cache est partagé (Redis, voir CACHES).
+    """
+    with transaction.atomic():
+        # Mise à jour conditionnelle : un seul planificateur publie un article donné
+        etats_avant = etats_articles([article.pk])
+        publie = Article.objects.filter(
+            pk=article.pk, est_publie=False, publication_programmee=True
+        ).update(est_publie=True, publication_programmee=False, date_modification=timezone.now())
+        if not publie:
+            return False
+        articles_modifies(etats_avant, etats_articles([article.pk]))
+        article.refresh_from_db()
+        transaction.on_commit(lambda: prerendre_article(article.id))
+        transaction.on_commit(lambda: invalider_pages_article(article.id))
+        transaction.on_commit(lambda: prechauffer_article(article.id))
+        # UPDATE sans save() : le signal post_save ne rafraîchit pas les totaux du rédacteur
+        transaction.on_commit(lambda: changer_version_listes(article.auteur_id))
+
+    try:
+        nb_abonnes = annoncer_article(article)
+        if nb_abonnes is None:
+            logger.info(f"Article programmé {article.id} publié, ajouté au prochain envoi de la newsletter")
+        else:
+            logger.info(f"Article programmé {article.id} publié, newsletter envoyée à {nb_abonnes} abonnés")
+    except Exception as e:
+        logger.error(f"Erreur lors de l'envoi de la newsletter pour l'article {article.id}: {str(e)}")
+    return True
+
+
+def publier_articles_programmes(maintenant=None):
+    """Publie tous les articles programmés arrivés à échéance ; renvoie leur nombre"""
+    publies = 0
+    for article in articles_a_publier(maintenant):
+        try:
+            if publier_article_programme(article):
+                publies += 1
+        except Exception as e:
+            logger.error(f"Erreur lors de la publication programmée de l'article {article.id}: {str(e)}")
+    return publies
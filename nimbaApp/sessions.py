@@ -0,0 +1,70 @@
+"""
+Sessions : en cache pour les visiteurs anonymes, en base pour les connectés.
+
+Les visiteurs anonymes n'ont presque rien en session (les messages sont
+dans un cookie signé, voir MESSAGE_STORAGE) : leur session, quand elle
+existe, ne vit que dans le cache et ne coûte aucune écriture en base. Dès
+qu'un utilisateur se connecte, sa session est aussi enregistrée en base
+(comme avec le moteur cached_db) pour survivre à un vidage du cache.
+
+Les sessions expirées sont supprimées par lots (commande `nettoyer_sessions`
+ou `clearsessions`), pour ne pas verrouiller la table pendant une longue
+suppression.
+"""
+import time
+
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.base import CreateError, UpdateError
+from django.contrib.sessions.backends.cached_db import SessionStore as SessionStoreCachedDb
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Nombre de sessions expirées supprimées par requête DELETE
+TAILLE_LOT_SESSIONS = 1000
+
+
+def supprimer_sessions_expirees(taille_lot=TAILLE_LOT_SESSIONS, pause=0):
+    """Supprime les sessions expirées par lots de clés ; renvoie le nombre supprimé"""
+    maintenant = timezone.now()
+    total = 0
+    while True:
+        cles = list(
+            Session.objects.filter(expire_date__lt=maintenant)
+            .values_list('session_key', flat=True)[:taille_lot]
+        )
+        if not cles:
+            break
+        total += Session.objects.filter(session_key__in=cles).delete()[0]
+        if pause:
+            time.sleep(pause)
+    logger.info(f"{total} session(s) expirée(s) supprimée(s)")
+    return total
+
+
+class SessionStore(SessionStoreCachedDb):
+    """Session en cache seulement tant qu'aucun utilisateur n'y est connecté"""
+
+    def save(self, must_create=False):
+        if SESSION_KEY in self._get_session(no_load=must_create):
+            try:
+                return super().save(must_create)
+            except UpdateError:
+                # Session anonyme (en cache seulement) dans laquelle l'utilisateur
+                # vient de se connecter : pas encore de ligne à mettre à jour
+                return super().save(must_create=True)
+
+        if self.session_key is None:
+            return self.create()
+        donnees = self._get_session(no_load=must_create)
+        if must_create:
+            if not self._cache.add(self.cache_key, donnees, self.get_expiry_age()):
+                raise CreateError
+        else:
+            self._cache.set(self.cache_key, donnees, self.get_expiry_age())
+
+    @classmethod
+    def clear_expired(cls):
+        supprimer_sessions_expirees()
@@ -0,0 +1,117 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .models import Article, Categorie, Publicite
+from .cache_utils import CLE_LIENS_PUBLICITES, cache_pages, changer_version_listes, cle_cache_publicites
+from .compteurs import articles_modifies, etats_articles
+from .prechauffage import prechauffer_article_en_arriere_plan
+from .prerendu import prerendre_article, prerendre_articles, supprimer_prerendu
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _apres_commit(fonction, identifiant):
+    """Exécute une tâche après le commit, sans faire échouer la sauvegarde"""
+    def tache():
+        try:
+            fonction(identifiant)
+        except Exception as e:
+            logger.error(f"Erreur lors de {fonction.__name__}({identifiant}): {str(e)}")
+
+    transaction.on_commit(tache)
+
+
+def invalider_pages_article(article_id):
+    """
+    Marque comme périmées les pages qui affichent un article : accueil, rubriques
+    (l'article a pu changer de catégorie) et page de l'article
+    """
+    cles = ['home', f'article:{article_id}']
+    cles += [f'categorie:{nom}' for nom in Categorie.objects.values_list('nom', flat=True)]
+    cache_pages.invalider(*cles)
+
+
+def articles_modifies_en_masse(article_ids, prerendre=True):
+    """
+    Équivalent de article_enregistre après un update() en masse, qui n'envoie
+    pas de signal : une seule invalidation pour toutes les pages, puis le
+    pré-rendu (écriture ou suppression) des articles concernés
+    """
+    def tache():
+        try:
+            cles = ['home'] + [f'article:{article_id}' for article_id in article_ids]
+            cles += [f'categorie:{nom}' for nom in Categorie.objects.values_list('nom', flat=True)]
+            cache_pages.invalider(*cles)
+            auteurs = Article.objects.filter(id__in=article_ids).values_list('auteur_id', flat=True).distinct()
+            for auteur_id in auteurs:
+                changer_version_listes(auteur_id)
+            if prerendre:
+                prerendre_articles(article_ids)
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement de {len(article_ids)} article(s) modifié(s) en masse: {str(e)}")
+
+    transaction.on_commit(tache)
+
+
+@receiver([pre_save, pre_delete], sender=Article)
+def memoriser_etat_article(sender, instance, **kwargs):
+    """Retient l'état en base de l'article pour mettre à jour les compteurs de catégorie"""
+    instance._etats_avant = etats_articles([instance.pk]) if instance.pk else []
+
+
+@receiver(post_save, sender=Article)
+def compteurs_apres_enregistrement(sender, instance, **kwargs):
+    articles_modifies(getattr(instance, '_etats_avant', []), etats_articles([instance.pk]))
+
+
+@receiver(post_delete, sender=Article)
+def compteurs_apres_suppression(sender, instance, **kwargs):
+    articles_modifies(getattr(instance, '_etats_avant', []), [])
+
+
+@receiver(post_save, sender=Article)
+def article_enregistre(sender, instance, **kwargs):
+    """
+    Après un enregistrement (vues, admin...) : invalide les pages en cache,
+    régénère la page pré-rendue et préchauffe les pages concernées
+    """
+    _apres_commit(invalider_pages_article, instance.id)
+    _apres_commit(prerendre_article, instance.id)
+    _apres_commit(changer_version_listes, instance.auteur_id)
+    if instance.est_publie:
+        _apres_commit(prechauffer_article_en_arriere_plan, instance.id)
+
+
+@receiver(post_delete, sender=Article)
+def article_supprime(sender, instance, **kwargs):
+    """Retire la page pré-rendue d'un article supprimé"""
+    _apres_commit(invalider_pages_article, instance.id)
+    _apres_commit(supprimer_prerendu, instance.id)
+    _apres_commit(changer_version_listes, instance.auteur_id)
+
+
+def invalider_emplacements(positions):
+    """Supprime les fragments en cache des emplacements publicitaires et la table des liens"""
+    cache.delete_many([cle_cache_publicites(position) for position in positions] + [CLE_LIENS_PUBLICITES])
+
+
+@receiver(pre_save, sender=Publicite)
+def memoriser_position_publicite(sender, instance, **kwargs):
+    """Retient l'emplacement en base d'une publicité, qu'elle quitte peut-être"""
+    instance._position_avant = (
+        Publicite.objects.filter(pk=instance.pk).values_list('position', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver([post_save, post_delete], sender=Publicite)
+def publicite_modifiee(sender, instance, **kwargs):
+    """
+    Invalide le cache de l'emplacement d'une publicité modifiée ou supprimée,
+    et celui de son ancien emplacement si elle en a changé
+    """
+    positions = {instance.position, getattr(instance, '_position_avant', None)} - {None}
+    _apres_commit(invalider_emplacements, positions)
+    _apres_commit(changer_version_listes, instance.auteur_id)
@@ -0,0 +1,53 @@
+from django.contrib.sitemaps import Sitemap
+from django.db.models import Count, Max
+from django.urls import reverse
+from .feeds import version_articles
+from .models import Article, Categorie
+
+
+class CategorieSitemap(Sitemap):
+    """Pages des rubriques, datées par leur dernier article publié (agrégat de la catégorie)"""
+    changefreq = 'hourly'
+    priority = 0.8
+
+    @staticmethod
+    def version():
+        """(dernière publication, nombre de rubriques) : ne dépend que de la table des catégories"""
+        agregats = Categorie.objects.aggregate(derniere=Max('date_dernier_article'), nombre=Count('id'))
+        return agregats['derniere'], agregats['nombre']
+
+    def items(self):
+        return Categorie.objects.only('nom', 'ordre', 'date_dernier_article').order_by('ordre', 'nom')
+
+    def location(self, item):
+        return reverse('nimbaApp:categorie', args=[item.nom])
+
+    def lastmod(self, item):
+        return item.date_dernier_article
+
+
+class ArticleSitemap(Sitemap):
+    """Articles publiés, datés par leur dernière modification"""
+    changefreq = 'weekly'
+    priority = 0.6
+    limit = 5000
+
+    @staticmethod
+    def version():
+        """(dernière modification, nombre d'articles publiés)"""
+        return version_articles()
+
+    def items(self):
+        return Article.objects.filter(est_publie=True).only('id', 'date_modification').order_by('-date_publication')
+
+    def location(self, item):
+        return reverse('nimbaApp:article_detail', args=[item.id])
+
+    def lastmod(self, item):
+        return item.date_modification
+
+
+sitemaps = {
+    'categories': CategorieSitemap,
+    'articles': ArticleSitemap,
+}
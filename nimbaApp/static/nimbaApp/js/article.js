@@ -0,0 +1,26 @@
+// Partage de l'article et comptage des lectures des pages pré-rendues
+const titreArticle = document.querySelector('article[data-titre]').dataset.titre;
+
+function shareOnFacebook() {
+    window.open('https://www.facebook.com/sharer/sharer.php?u=' + encodeURIComponent(window.location.href), '_blank');
+}
+
+function shareOnTwitter() {
+    window.open('https://twitter.com/intent/tweet?url=' + encodeURIComponent(window.location.href) + '&text=' + encodeURIComponent(titreArticle), '_blank');
+}
+
+function shareOnWhatsApp() {
+    window.open('https://wa.me/?text=' + encodeURIComponent(titreArticle + ' - ' + window.location.href), '_blank');
+}
+
+function copyLink() {
+    navigator.clipboard.writeText(window.location.href).then(function() {
+        alert('Lien copié !');
+    });
+}
+
+// Page pré-rendue : le compteur de vues est incrémenté séparément
+const urlVue = document.currentScript.dataset.urlVue;
+if (urlVue) {
+    fetch(urlVue, {method: 'POST', keepalive: true});
+}
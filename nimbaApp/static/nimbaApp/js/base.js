@@ -0,0 +1,71 @@
+// Toggle mobile menu
+const mobileMenuBtn = document.getElementById('mobile-menu-btn');
+const mobileMenu = document.getElementById('mobile-menu');
+const menuOpenIcon = document.getElementById('menu-open-icon');
+const menuCloseIcon = document.getElementById('menu-close-icon');
+
+mobileMenuBtn.addEventListener('click', function() {
+    mobileMenu.classList.toggle('hidden');
+    menuOpenIcon.classList.toggle('hidden');
+    menuCloseIcon.classList.toggle('hidden');
+});
+
+// Live time display
+function updateTime() {
+    const now = new Date();
+    const options = {
+        hour: '2-digit',
+        minute: '2-digit',
+        hour12: false
+    };
+    const timeString = now.toLocaleTimeString('fr-FR', options);
+    const timeElement = document.getElementById('live-time');
+    if (timeElement) {
+        timeElement.textContent = timeString;
+    }
+}
+updateTime();
+setInterval(updateTime, 1000);
+
+// Back to top button
+const backToTopButton = document.getElementById('back-to-top');
+
+window.addEventListener('scroll', function() {
+    if (window.pageYOffset > 300) {
+        backToTopButton.style.opacity = '1';
+        backToTopButton.style.pointerEvents = 'auto';
+    } else {
+        backToTopButton.style.opacity = '0';
+        backToTopButton.style.pointerEvents = 'none';
+    }
+});
+
+backToTopButton.addEventListener('click', function() {
+    window.scrollTo({
+        top: 0,
+        behavior: 'smooth'
+    });
+});
+
+// Emplacements publicitaires : chargés après la page, avec leur propre cache
+document.querySelectorAll('[data-emplacement-publicite]').forEach(function(emplacement) {
+    fetch(emplacement.dataset.emplacementPublicite)
+        .then(function(reponse) { return reponse.ok ? reponse.text() : ''; })
+        .then(function(html) { emplacement.innerHTML = html; })
+        .catch(function() {});
+});
+
+// Formulaires publics : les pages en cache ne contiennent pas de jeton CSRF,
+// il est demandé au moment de l'envoi
+document.querySelectorAll('form[data-jeton-csrf]').forEach(function(formulaire) {
+    formulaire.addEventListener('submit', function(evenement) {
+        evenement.preventDefault();
+        fetch(formulaire.dataset.jetonCsrf, {credentials: 'same-origin'})
+            .then(function(reponse) { return reponse.json(); })
+            .then(function(donnees) {
+                formulaire.elements.csrfmiddlewaretoken.value = donnees.jeton;
+                formulaire.submit();
+            })
+            .catch(function() { formulaire.submit(); });
+    });
+});
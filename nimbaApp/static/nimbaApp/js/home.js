@@ -0,0 +1,70 @@
+// Carrousel des articles à la une
+let currentSlide = 0;
+const slides = document.querySelectorAll('.carousel-slide');
+const totalSlides = slides.length;
+let autoSlideInterval;
+
+// Créer les indicateurs dynamiquement
+const indicatorsContainer = document.getElementById('carousel-indicators');
+for (let i = 0; i < totalSlides; i++) {
+    const indicator = document.createElement('button');
+    indicator.className = 'carousel-indicator w-3 h-3 rounded-full transition';
+    indicator.style.backgroundColor = i === 0 ? 'white' : 'rgba(255, 255, 255, 0.5)';
+    indicator.setAttribute('data-index', i);
+    indicator.onclick = () => goToSlide(i);
+    indicatorsContainer.appendChild(indicator);
+}
+
+const indicators = document.querySelectorAll('.carousel-indicator');
+
+function showSlide(index) {
+    slides.forEach((slide, i) => {
+        if (i === index) {
+            slide.classList.add('active');
+            slide.style.opacity = '1';
+            slide.style.zIndex = '1';
+        } else {
+            slide.classList.remove('active');
+            slide.style.opacity = '0';
+            slide.style.zIndex = '0';
+        }
+    });
+
+    indicators.forEach((indicator, i) => {
+        indicator.style.backgroundColor = i === index ? 'white' : 'rgba(255, 255, 255, 0.5)';
+    });
+}
+
+function nextSlide() {
+    currentSlide = (currentSlide + 1) % totalSlides;
+    showSlide(currentSlide);
+    resetAutoSlide();
+}
+
+function prevSlide() {
+    currentSlide = (currentSlide - 1 + totalSlides) % totalSlides;
+    showSlide(currentSlide);
+    resetAutoSlide();
+}
+
+function goToSlide(index) {
+    currentSlide = index;
+    showSlide(currentSlide);
+    resetAutoSlide();
+}
+
+function startAutoSlide() {
+    if (totalSlides > 1) {
+        autoSlideInterval = setInterval(nextSlide, 5000); // Change toutes les 5 secondes
+    }
+}
+
+function resetAutoSlide() {
+    clearInterval(autoSlideInterval);
+    startAutoSlide();
+}
+
+// Démarrer le défilement automatique au chargement
+if (totalSlides > 1) {
+    startAutoSlide();
+}
@@ -0,0 +1,22 @@
+// Configuration du compilateur Tailwind du navigateur (mode de secours, voir base.html).
+// Garder synchronisé avec nimbaApp/assets/tailwind.config.js.
+tailwind.config = {
+    theme: {
+        extend: {
+            colors: {
+                'forest': {
+                    50: '#f0fdf4',
+                    100: '#dcfce7',
+                    200: '#bbf7d0',
+                    300: '#86efac',
+                    400: '#4ade80',
+                    500: '#22c55e',
+                    600: '#16a34a',
+                    700: '#15803d',
+                    800: '#166534',
+                    900: '#14532d',
+                }
+            }
+        }
+    }
+}
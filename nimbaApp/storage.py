@@ -0,0 +1,108 @@
+"""
+Stockage des fichiers statiques et des fichiers envoyés (médias).
+
+collectstatic écrit des copies aux noms hachés (nimba.3f2a1c.css) et, pour les
+fichiers texte, des variantes précompressées .gz (et .br si le module
+`brotli` est installé). Les noms changeant avec le contenu, le serveur web
+peut les servir avec un cache d'un an, par exemple avec nginx :
+
+    location /static/ {
+        gzip_static on;
+        brotli_static on;
+        expires 1y;
+        add_header Cache-Control "public, immutable";
+    }
+
+Les images envoyées (articles, publicités) sont nommées d'après l'empreinte
+SHA-256 de leur contenu : une même image envoyée plusieurs fois n'est stockée
+qu'une fois, et un nom ne désigne jamais qu'un seul contenu. Ces fichiers
+peuvent donc eux aussi être servis avec un cache d'un an :
+
+    location ~ "/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]+$" {
+        expires 1y;
+        add_header Cache-Control "public, immutable";
+    }
+
+Les fichiers qui ne sont plus référencés sont supprimés par la commande
+`nettoyer_medias`.
+"""
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:  # Compression brotli optionnelle
+    brotli = None
+
+EXTENSIONS_COMPRESSIBLES = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.map', '.ico')
+
+
+class StockageStatiqueCompresse(ManifestStaticFilesStorage):
+    """Fichiers statiques hachés accompagnés de variantes précompressées"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        noms = set(paths) | set(self.hashed_files.values())
+        for nom in sorted(noms):
+            if nom.endswith(EXTENSIONS_COMPRESSIBLES) and self.exists(nom):
+                self._ecrire_variantes(nom)
+
+    def _ecrire_variantes(self, nom):
+        chemin = self.path(nom)
+        with open(chemin, 'rb') as fichier:
+            contenu = fichier.read()
+
+        variantes = {'.gz': gzip.compress(contenu, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variantes['.br'] = brotli.compress(contenu)
+
+        for extension, compresse in variantes.items():
+            # Inutile de garder une variante qui ne fait rien gagner
+            if len(compresse) < len(contenu):
+                with open(chemin + extension, 'wb') as fichier:
+                    fichier.write(compresse)
+
+
+def nom_contenu(nom, contenu):
+    """Nom définitif d'un fichier envoyé : dossier d'origine, empreinte du contenu et extension"""
+    empreinte = hashlib.sha256()
+    for morceau in contenu.chunks():
+        empreinte.update(morceau)
+    empreinte = empreinte.hexdigest()
+
+    extension = os.path.splitext(nom)[1].lower()
+    if not re.fullmatch(r'\.[a-z0-9]{1,5}', extension):
+        extension = ''
+    return posixpath.join(posixpath.dirname(nom), empreinte[:2], empreinte + extension)
+
+
+class StockageMediaContenu(FileSystemStorage):
+    """Fichiers envoyés nommés par l'empreinte de leur contenu, sans doublon"""
+
+    def get_available_name(self, name, max_length=None):
+        # Le nom définitif, calculé par _save, ne dépend que du contenu
+        return name
+
+    def _save(self, name, content):
+        nom = nom_contenu(name, content)
+        if self.exists(nom):
+            # Contenu déjà stocké : rafraîchir sa date pour que nettoyer_medias,
+            # qui épargne les fichiers récents, ne le supprime pas entre-temps
+            os.utime(self.path(nom))
+            return nom
+
+        # Écriture sous un nom temporaire unique puis renommage atomique : deux
+        # envois simultanés du même contenu produisent le même fichier
+        temporaire = super()._save(f"{nom}.{uuid.uuid4().hex}.tmp", content)
+        os.replace(self.path(temporaire), self.path(nom))
+        return nom
@@ -0,0 +1,204 @@
+"""
+Classements « Tendances » et « Les plus lus ».
+
+Les lectures sont comptées par tranche horaire (VueHoraire). La commande
+`calculer_tendances`, lancée régulièrement par cron, intègre les nouvelles
+vues au score décroissant de chaque article concerné (TendanceArticle), purge
+les tranches sorties de la fenêtre puis range les N meilleurs articles, pour
+tout le site et par catégorie, dans le cache (partagé), pour deux passages :
+la page d'accueil et les pages des rubriques n'ont plus qu'une lecture de
+cache à faire, et des classements que cron ne rafraîchit plus finissent par
+être recalculés à la demande.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from .compteurs import ajouter_vues
+from .models import Article, TendanceArticle, VueHoraire
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Demi-vie du score de tendance : une vue compte moitié moins après ce délai
+DEMI_VIE = timedelta(hours=6)
+
+# Fenêtre glissante conservée pour les tendances et les plus lus
+FENETRE = timedelta(hours=48)
+
+# Période prise en compte pour « Les plus lus »
+PERIODE_PLUS_LUS = timedelta(hours=24)
+
+# Nombre d'articles par classement
+NB_CLASSEMENT = 5
+
+# Date de référence des scores stockés (voir TendanceArticle)
+REFERENCE = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+# Intervalle prévu entre deux passages de la commande calculer_tendances (cron)
+INTERVALLE_CALCUL = timedelta(minutes=10)
+
+CLE_CACHE_CLASSEMENTS = 'nimba:classements'
+# Durée de conservation des classements : deux passages de cron
+DUREE_CACHE_CLASSEMENTS = int(2 * INTERVALLE_CALCUL.total_seconds())
+
+
+def debut_heure(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def enregistrer_vue(article_id, moment=None):
+    """Ajoute une lecture à la tranche horaire courante d'un article"""
+    heure = debut_heure(moment or timezone.now())
+    if VueHoraire.objects.filter(article_id=article_id, heure=heure).update(vues=F('vues') + 1):
+        return
+    try:
+        with transaction.atomic():
+            VueHoraire.objects.create(article_id=article_id, heure=heure, vues=1)
+    except IntegrityError:
+        # Tranche créée entre-temps par une autre requête
+        VueHoraire.objects.filter(article_id=article_id, heure=heure).update(vues=F('vues') + 1)
+
+
+def _log2_somme(a, b):
+    """log2(2**a + 2**b) sans débordement"""
+    if a is None:
+        return b
+    haut, bas = max(a, b), min(a, b)
+    return haut + math.log2(1 + 2 ** (bas - haut))
+
+
+def _contribution_log(vues, heure):
+    """log2 de la contribution de `vues` lectures à l'heure donnée, rapportée à REFERENCE"""
+    return math.log2(vues) + (heure - REFERENCE) / DEMI_VIE
+
+
+def mettre_a_jour_scores():
+    """
+    Intègre les vues non encore comptées au score des articles concernés
+    et purge les tranches sorties de la fenêtre. Renvoie le nombre d'articles mis à jour.
+    """
+    tranches = list(
+        VueHoraire.objects.filter(vues__gt=F('vues_comptees'))
+        .annotate(article_categorie_id=F('article__categorie_id'), article_est_publie=F('article__est_publie'))
+        .order_by('article_id', 'heure')
+    )
+    par_article = {}
+    for tranche in tranches:
+        par_article.setdefault(tranche.article_id, []).append(tranche)
+
+    tendances = TendanceArticle.objects.in_bulk(list(par_article))
+    a_creer, a_modifier = [], []
+    for article_id, tranches_article in par_article.items():
+        tendance = tendances.get(article_id)
+        score = tendance.score_log if tendance else None
+        for tranche in tranches_article:
+            score = _log2_somme(score, _contribution_log(tranche.vues - tranche.vues_comptees, tranche.heure))
+        derniere_heure = tranches_article[-1].heure
+        if tendance is None:
+            a_creer.append(TendanceArticle(
+                article_id=article_id,
+                categorie_id=tranches_article[0].article_categorie_id,
+                score_log=score,
+                derniere_activite=derniere_heure,
+            ))
+        else:
+            tendance.score_log = score
+            tendance.categorie_id = tranches_article[0].article_categorie_id
+            tendance.derniere_activite = max(tendance.derniere_activite, derniere_heure)
+            a_modifier.append(tendance)
+
+    # Lectures comptées par un UPDATE sans signal : reportées ici sur l'article
+    # (vues_comptees) et, s'il est publié, sur le total de sa catégorie
+    vues_par_article = {}
+    vues_par_categorie = {}
+    for tranche in tranches:
+        nouvelles = tranche.vues - tranche.vues_comptees
+        vues_par_article[tranche.article_id] = vues_par_article.get(tranche.article_id, 0) + nouvelles
+        if tranche.article_est_publie:
+            vues_par_categorie[tranche.article_categorie_id] = (
+                vues_par_categorie.get(tranche.article_categorie_id, 0) + nouvelles
+            )
+
+    with transaction.atomic():
+        for article_id, nouvelles in vues_par_article.items():
+            Article.objects.filter(pk=article_id).update(vues_comptees=F('vues_comptees') + nouvelles)
+        ajouter_vues(vues_par_categorie)
+        TendanceArticle.objects.bulk_create(a_creer)
+        TendanceArticle.objects.bulk_update(a_modifier, ['score_log', 'categorie', 'derniere_activite'])
+        # Marquer comme comptées les vues lues (et non F('vues') : celles arrivées
+        # entre-temps seront intégrées au prochain passage)
+        for tranche in tranches:
+            VueHoraire.objects.filter(pk=tranche.pk).update(vues_comptees=tranche.vues)
+
+    limite = timezone.now() - FENETRE
+    VueHoraire.objects.filter(heure__lt=limite).delete()
+    TendanceArticle.objects.filter(derniere_activite__lt=limite).delete()
+    return len(par_article)
+
+
+def _resume(article):
+    """Données minimales d'un article pour l'affichage d'un classement"""
+    return {
+        'id': article.id,
+        'titre': article.titre,
+        'categorie': article.categorie.get_nom_display(),
+        'image': article.image.url if article.image else '',
+        'date_publication': article.date_publication,
+    }
+
+
+def calculer_classements():
+    """
+    Calcule les classements (site entier et par catégorie) et les range dans le
+    cache. Une seule lecture des articles actifs sur la fenêtre, déjà bornée par
+    la purge, sert à tous les classements de tendance.
+    """
+    limite = timezone.now() - FENETRE
+    tendances_ids = []
+    par_categorie_ids = {}
+    for article_id, categorie_id in (
+        TendanceArticle.objects.filter(derniere_activite__gte=limite, article__est_publie=True)
+        .order_by('-score_log')
+        .values_list('article_id', 'categorie_id')
+    ):
+        if len(tendances_ids) < NB_CLASSEMENT:
+            tendances_ids.append(article_id)
+        liste = par_categorie_ids.setdefault(categorie_id, [])
+        if len(liste) < NB_CLASSEMENT:
+            liste.append(article_id)
+
+    plus_lus_ids = list(
+        VueHoraire.objects.filter(heure__gte=timezone.now() - PERIODE_PLUS_LUS, article__est_publie=True)
+        .values('article_id')
+        .annotate(total=Sum('vues'))
+        .order_by('-total')
+        .values_list('article_id', flat=True)[:NB_CLASSEMENT]
+    )
+
+    ids = set(tendances_ids) | set(plus_lus_ids)
+    for liste in par_categorie_ids.values():
+        ids.update(liste)
+    articles = Article.objects.select_related('categorie').in_bulk(ids)
+
+    def resumes(liste):
+        return [_resume(articles[i]) for i in liste if i in articles]
+
+    classements = {
+        'tendances': resumes(tendances_ids),
+        'plus_lus': resumes(plus_lus_ids),
+        'par_categorie': {categorie_id: resumes(liste) for categorie_id, liste in par_categorie_ids.items()},
+    }
+    cache.set(CLE_CACHE_CLASSEMENTS, classements, DUREE_CACHE_CLASSEMENTS)
+    return classements
+
+
+def obtenir_classements():
+    """Classements pour l'affichage : une seule lecture de cache"""
+    classements = cache.get(CLE_CACHE_CLASSEMENTS)
+    if classements is None:
+        classements = calculer_classements()
+    return classements
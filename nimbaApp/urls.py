@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, archives, views
 
 app_name = 'nimbaApp'
 
@@ -8,9 +8,28 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('categorie/<str:categorie>/', views.categorie_view, name='categorie'),
     path('article/<int:id>/', views.article_detail, name='article_detail'),
+    path('article/<int:id>/vue/', views.article_vue, name='article_vue'),
+
+    # Archives par date
+    path('archives/', archives.archives, name='archives'),
+    path('archives/<int:annee>/', archives.archives, name='archives_annee'),
+    path('archives/<int:annee>/<int:mois>/', archives.archives, name='archives_mois'),
+    path('categorie/<str:categorie>/archives/', archives.archives, name='archives_categorie'),
+    path('categorie/<str:categorie>/archives/<int:annee>/', archives.archives, name='archives_categorie_annee'),
+    path('categorie/<str:categorie>/archives/<int:annee>/<int:mois>/', archives.archives,
+         name='archives_categorie_mois'),
+
+    # Flux et sitemaps
+    path('flux/rss/', views.flux_rss, name='flux_rss'),
+    path('flux/atom/', views.flux_atom, name='flux_atom'),
+    path('categorie/<str:categorie>/rss/', views.flux_rss, name='flux_rss_categorie'),
+    path('categorie/<str:categorie>/atom/', views.flux_atom, name='flux_atom_categorie'),
+    path('sitemap.xml', views.sitemap_index, name='sitemap'),
+    path('sitemap-<str:section>.xml', views.sitemap_section, name='sitemap_section'),
 
     # Newsletter
     path('newsletter/inscription/', views.inscription_newsletter, name='inscription_newsletter'),
+    path('jeton-csrf/', views.jeton_csrf, name='jeton_csrf'),
 
     # Authentification
     path('connexion/', views.connexion, name='connexion'),
@@ -18,6 +37,7 @@ urlpatterns = [
 
     # Dashboard propriétaire
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/profils/<str:profil_id>/', views.telecharger_profil, name='telecharger_profil'),
     path('creer-article/', views.creer_article, name='creer_article'),
     path('creer-publicite/', views.creer_publicite, name='creer_publicite'),
 
@@ -33,4 +53,11 @@ urlpatterns = [
 
     # Publicités
     path('publicite/<int:id>/clic/', views.clic_publicite, name='clic_publicite'),
+    path('publicites/<str:position>/', views.emplacement_publicite, name='emplacement_publicite'),
+
+    # API JSON (lecture seule)
+    path('api/v1/articles/', api.liste_articles, name='api_articles'),
+    path('api/v1/articles/<int:id>/', api.detail_article, name='api_article'),
+    path('api/v1/categories/', api.liste_categories, name='api_categories'),
+    path('api/v1/publicites/<str:position>/', api.publicites_position, name='api_publicites'),
 ]
\ No newline at end of file
@@ -3,24 +3,79 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.utils import timezone
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import Http404, HttpResponse, JsonResponse
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.core.paginator import Paginator
+from django.db.models import F, Sum
+from django.utils.functional import cached_property
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.csrf import csrf_exempt
+from django.middleware.csrf import get_token
+from django.contrib.sitemaps import views as sitemap_views
 from .models import Article, Categorie, Publicite, Newsletter
-from .email_utils import envoyer_newsletter_nouvel_article, envoyer_email_bienvenue_newsletter
+from .email_utils import envoyer_email_bienvenue_newsletter
+from .limitation import (
+    clic_deja_compte, limiter_debit, requete_autorisee, statistiques as statistiques_limitation, vue_deja_comptee,
+)
+from .newsletter import annoncer_article
+from .profilage import PARAMETRE_PROFILAGE, creer_jeton, liste_profils, obtenir_profil
+from .cache_utils import CLE_LIENS_PUBLICITES, cache_pages, cle_cache_publicites, reponse_versionnee, version_listes
+from .feeds import DerniersArticlesFeed, DerniersArticlesAtomFeed, version_articles
+from .sitemaps import sitemaps
+from .tendances import enregistrer_vue, obtenir_classements
+from datetime import datetime, time, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Nombre de publicités affichées par emplacement
+NB_PUBLICITES_PAR_POSITION = {
+    'header': 1,
+    'sidebar': 3,
+    'footer': 1,
+    'article': 1,
+}
+
+# Durée de cache des emplacements publicitaires (en secondes)
+DUREE_CACHE_PUBLICITES = 60
+# Durée de cache de la table des liens des publicités (vidée à chaque modification)
+DUREE_CACHE_LIENS_PUBLICITES = 60 * 60
+
 
 def is_staff_user(user):
     """Vérifie si l'utilisateur est un membre du staff"""
     return user.is_staff
 
 
+@never_cache
+@require_GET
+def jeton_csrf(request):
+    """
+    Jeton CSRF des formulaires publics : les pages en cache et pré-rendues sont
+    les mêmes pour tous les visiteurs et n'en contiennent pas (voir base.js)
+    """
+    return JsonResponse({'jeton': get_token(request)})
+
+
 @require_POST
+@limiter_debit('inscription_newsletter')
 def inscription_newsletter(request):
-    """Inscription à la newsletter"""
+    """
+    Inscription à la newsletter
+
+    La fréquence choisie ne s'applique qu'à une nouvelle inscription : le
+    formulaire étant public, il ne permet pas de modifier l'abonnement d'une
+    adresse existante.
+    """
     email = request.POST.get('email', '').strip()
+    frequence = request.POST.get('frequence')
+    if frequence not in dict(Newsletter.FREQUENCE_CHOICES):
+        frequence = None
 
     if not email:
         messages.error(request, 'Veuillez entrer une adresse email.')
@@ -30,7 +85,7 @@ def inscription_newsletter(request):
         # Vérifier si l'email existe déjà
         newsletter, created = Newsletter.objects.get_or_create(
             email=email,
-            defaults={'est_actif': True}
+            defaults={'est_actif': True, 'frequence': frequence or 'reguliere'}
         )
 
         if created:
@@ -58,97 +113,214 @@ def inscription_newsletter(request):
     return redirect(request.META.get('HTTP_REFERER', 'nimbaApp:home'))
 
 
+def page_en_cache(request, cle, construire):
+    """
+    Sert une page publique depuis le cache des pages pour les visiteurs anonymes.
+    Les membres du staff et les réponses portant des messages sont toujours reconstruits.
+    """
+    if request.user.is_authenticated or messages.get_messages(request):
+        return construire()
+    return HttpResponse(cache_pages.obtenir(cle, lambda: construire().content))
+
+
 def home(request):
     """Page d'accueil publique"""
+    return page_en_cache(request, 'home', lambda: _home(request))
+
+
+def _home(request):
     # Article principal à la une (pour le carrousel principal)
-    article_une = Article.objects.filter(est_publie=True, est_a_la_une=True).first()
+    publies = Article.objects.filter(est_publie=True).select_related('categorie')
+    article_une = publies.filter(est_a_la_une=True).first()
     if not article_une:
-        article_une = Article.objects.filter(est_publie=True).first()
+        article_une = publies.first()
 
     # Tous les articles récents (excluant l'article principal)
     if article_une:
-        articles_recents = Article.objects.filter(est_publie=True).exclude(id=article_une.id)[:10]
+        articles_recents = publies.exclude(id=article_une.id)[:10]
     else:
-        articles_recents = Article.objects.filter(est_publie=True)[:10]
-
-    # Articles par catégorie
-    categories = Categorie.objects.all()
+        articles_recents = publies[:10]
+
+    # Derniers articles de chaque catégorie, tenus à jour dans la catégorie (voir
+    # compteurs.py) : une seule requête pour toutes les rubriques
+    categories = list(Categorie.objects.all())
+    derniers = publies.in_bulk([
+        article_id for cat in categories for article_id in cat.derniers_articles_ids
+    ])
     articles_par_categorie = {}
     for cat in categories:
-        articles = Article.objects.filter(categorie=cat, est_publie=True)[:3]
+        articles = [derniers[article_id] for article_id in cat.derniers_articles_ids if article_id in derniers]
         if articles:
             articles_par_categorie[cat] = articles
 
-    # Publicités actives
-    now = timezone.now()
-    publicites_header = Publicite.objects.filter(
-        position='header',
-        est_active=True,
-        date_debut__lte=now,
-        date_fin__gte=now
-    ).first()
-
-    publicites_sidebar = Publicite.objects.filter(
-        position='sidebar',
-        est_active=True,
-        date_debut__lte=now,
-        date_fin__gte=now
-    )[:3]
+    # Classements précalculés (voir tendances.py)
+    classements = obtenir_classements()
 
+    # Les publicités sont chargées séparément (voir emplacement_publicite)
     context = {
         'article_une': article_une,
         'articles_recents': articles_recents,
         'articles_par_categorie': articles_par_categorie,
         'categories': categories,
-        'publicites_header': publicites_header,
-        'publicites_sidebar': publicites_sidebar,
+        'classements_sidebar': [
+            ('Tendances', classements['tendances']),
+            ('Les plus lus', classements['plus_lus']),
+        ],
     }
     return render(request, 'home.html', context)
 
 
 def categorie_view(request, categorie):
     """Vue pour afficher les articles d'une catégorie"""
+    return page_en_cache(request, f'categorie:{categorie}', lambda: _categorie_view(request, categorie))
+
+
+def _categorie_view(request, categorie):
     cat = get_object_or_404(Categorie, nom=categorie)
     articles = Article.objects.filter(categorie=cat, est_publie=True)
 
     context = {
         'categorie': cat,
         'articles': articles,
-        'categories': Categorie.objects.all(),
+        # Classement précalculé de la rubrique (voir tendances.py)
+        'tendances_categorie': obtenir_classements()['par_categorie'].get(cat.id, []),
+        'categories': Categorie.objects.select_related('dernier_article').only(
+            'nom', 'ordre', 'nb_articles_publies', 'date_dernier_article', 'dernier_article__titre'
+        ),
     }
     return render(request, 'categorie.html', context)
 
 
-def article_detail(request, id):
-    """Vue détaillée d'un article"""
-    article = get_object_or_404(Article, id=id, est_publie=True)
-
-    # Incrémenter les vues
-    article.vues += 1
-    article.save()
-
+def contexte_article_detail(article):
+    """Contexte de la page article, partagé entre la vue et le pré-rendu statique"""
     # Articles similaires
     articles_similaires = Article.objects.filter(
         categorie=article.categorie,
         est_publie=True
     ).exclude(id=article.id)[:3]
 
-    # Publicités
+    # Les publicités sont chargées séparément (voir emplacement_publicite)
+    return {
+        'article': article,
+        'articles_similaires': articles_similaires,
+        'categories': Categorie.objects.all(),
+    }
+
+
+def article_detail(request, id):
+    """Vue détaillée d'un article"""
+    # Incrémenter les vues (UPDATE atomique, sans déclencher post_save ni le pré-rendu) ;
+    # la mise à jour vérifie aussi que l'article existe et est publié
+    if not Article.objects.filter(id=id, est_publie=True).update(vues=F('vues') + 1):
+        raise Http404("Article introuvable")
+    enregistrer_vue(id)
+    return page_en_cache(request, f'article:{id}', lambda: _article_detail(request, id))
+
+
+def _article_detail(request, id):
+    article = get_object_or_404(Article.objects.select_related('categorie', 'auteur'), id=id, est_publie=True)
+    return render(request, 'article_detail.html', contexte_article_detail(article))
+
+
+@csrf_exempt
+@require_POST
+def article_vue(request, id):
+    """
+    Compte une lecture d'une page pré-rendue servie directement par le serveur
+    web. Exemptée de CSRF (la page est statique) : la limitation de débit et le
+    dédoublonnage par adresse, dans le cache, écartent les rafales et les
+    rechargements avant toute écriture en base.
+    """
+    if not requete_autorisee(request, 'vue_article') or vue_deja_comptee(request, id):
+        return HttpResponse(status=204)
+    if Article.objects.filter(id=id, est_publie=True).update(vues=F('vues') + 1):
+        enregistrer_vue(id)
+    return HttpResponse(status=204)
+
+
+def publicites_actives(position):
+    """Publicités en cours de validité pour un emplacement"""
     now = timezone.now()
-    publicites_article = Publicite.objects.filter(
-        position='article',
+    return Publicite.objects.filter(
+        position=position,
         est_active=True,
         date_debut__lte=now,
         date_fin__gte=now
-    ).first()
+    )[:NB_PUBLICITES_PAR_POSITION.get(position, 1)]
+
+
+def donnees_emplacement(position):
+    """Publicités d'un emplacement, en HTML et en JSON, mises en cache brièvement"""
+    donnees = cache.get(cle_cache_publicites(position))
+    if donnees is None:
+        publicites = list(publicites_actives(position))
+        donnees = {
+            'html': render_to_string('emplacement_publicite.html', {
+                'position': position,
+                'publicites': publicites,
+            }),
+            'publicites': [
+                {
+                    'id': pub.id,
+                    'titre': pub.titre,
+                    'description': pub.description,
+                    'image': pub.image.url if pub.image else '',
+                    'lien': reverse('nimbaApp:clic_publicite', args=[pub.id]),
+                }
+                for pub in publicites
+            ],
+        }
+        cache.set(cle_cache_publicites(position), donnees, DUREE_CACHE_PUBLICITES)
+    return donnees
+
+
+def emplacement_publicite(request, position):
+    """
+    Fragment HTML (ou JSON avec ?format=json) d'un emplacement publicitaire.
+    Chargé après la page pour que le HTML des articles ne dépende pas de l'heure.
+    """
+    if position not in NB_PUBLICITES_PAR_POSITION:
+        raise Http404("Emplacement publicitaire inconnu")
+
+    donnees = donnees_emplacement(position)
+    if request.GET.get('format') == 'json':
+        response = JsonResponse({'position': position, 'publicites': donnees['publicites']})
+    else:
+        response = HttpResponse(donnees['html'])
+    patch_cache_control(response, public=True, max_age=DUREE_CACHE_PUBLICITES)
+    return response
+
+
+# Flux RSS / Atom, régénérés uniquement quand les articles concernés changent
+flux_rss = reponse_versionnee('flux-rss', version_articles)(DerniersArticlesFeed())
+flux_atom = reponse_versionnee('flux-atom', version_articles)(DerniersArticlesAtomFeed())
+
+
+def version_sitemap(section=None):
+    """
+    Version d'une section du sitemap (voir Sitemap.version), chacune étant
+    régénérée indépendamment ; celle de l'index, qui date chaque section, est
+    la plus récente des sections
+    """
+    if section is not None:
+        classe = sitemaps.get(section)
+        return classe.version() if classe else (None, 0)
+    versions = [classe.version() for classe in sitemaps.values()]
+    dates = [date for date, _ in versions if date]
+    return max(dates) if dates else None, sum(compteur for _, compteur in versions)
 
-    context = {
-        'article': article,
-        'articles_similaires': articles_similaires,
-        'categories': Categorie.objects.all(),
-        'publicite_article': publicites_article,
-    }
-    return render(request, 'article_detail.html', context)
+
+@reponse_versionnee('sitemap', version_sitemap)
+def sitemap_index(request):
+    """Index des sitemaps (une entrée par section)"""
+    return sitemap_views.index(request, sitemaps, sitemap_url_name='nimbaApp:sitemap_section')
+
+
+# Le sitemap d'une section est paginé par Django (?p=)
+@reponse_versionnee('sitemap', version_sitemap, parametres=('p',))
+def sitemap_section(request, section):
+    """Sitemap d'une section (catégories ou articles)"""
+    return sitemap_views.sitemap(request, sitemaps, section=section)
 
 
 def connexion(request):
@@ -175,11 +347,14 @@ def connexion(request):
 @user_passes_test(is_staff_user)
 def dashboard(request):
     """Dashboard du propriétaire"""
-    articles_count = Article.objects.filter(auteur=request.user).count()
-    publicites_count = Publicite.objects.filter(auteur=request.user).count()
-    articles_recents = Article.objects.filter(auteur=request.user).order_by('-date_publication')[:5]
-    publicites_recentes = Publicite.objects.filter(auteur=request.user).order_by('-date_creation')[:5]
-    total_vues = sum(article.vues for article in Article.objects.filter(auteur=request.user))
+    articles = Article.objects.filter(auteur=request.user)
+    publicites = Publicite.objects.filter(auteur=request.user)
+    # Mêmes totaux en cache que les listes non filtrées
+    articles_count = compter_en_cache(cle_compte_liste(request.user.id, 'articles'), articles)
+    publicites_count = compter_en_cache(cle_compte_liste(request.user.id, 'publicites'), publicites)
+    articles_recents = articles.select_related('categorie').defer('contenu').order_by('-date_publication')[:5]
+    publicites_recentes = publicites.order_by('-date_creation')[:5]
+    total_vues = articles.aggregate(total=Sum('vues'))['total'] or 0
 
     # Statistique newsletter
     newsletter_count = Newsletter.objects.filter(est_actif=True).count()
@@ -191,18 +366,138 @@ def dashboard(request):
         'publicites_recentes': publicites_recentes,  # AJOUT DE CETTE LIGNE
         'total_vues': total_vues,
         'newsletter_count': newsletter_count,
+        'statistiques_cache': cache_pages.statistiques(),
+        'statistiques_limitation': statistiques_limitation(),
+        'profils': liste_profils(),
+        'parametre_profilage': PARAMETRE_PROFILAGE,
+        'jeton_profilage': creer_jeton(request.user),
     }
     return render(request, 'dashboard.html', context)
 
 
+@login_required
+@user_passes_test(is_staff_user)
+def telecharger_profil(request, profil_id):
+    """Profil d'une requête : fichier pstats (.prof) ou, avec ?format=texte, rapport lisible"""
+    resume, contenu = obtenir_profil(profil_id)
+    if resume is None:
+        raise Http404("Profil introuvable ou expiré")
+    if request.GET.get('format') == 'texte':
+        entete = (f"{resume['methode']} {resume['url']} -> {resume['statut']}, {resume['duree_ms']} ms, "
+                  f"{resume['nb_requetes_sql']} requêtes SQL ({resume['duree_sql_ms']} ms)\n\n")
+        return HttpResponse(entete + contenu['rapport'], content_type='text/plain; charset=utf-8')
+    response = HttpResponse(contenu['donnees'], content_type='application/octet-stream')
+    response['Content-Disposition'] = f'attachment; filename="profil-{profil_id}.prof"'
+    return response
+
+
+# Listes des rédacteurs : taille de page et durée de conservation des totaux
+# (les totaux sont aussi rendus obsolètes à chaque modification, voir signals.py)
+NB_PAR_PAGE_LISTES = 20
+DUREE_CACHE_COMPTES = 300
+
+TRIS_ARTICLES = {
+    'recents': ('-date_publication', '-id'),
+    'anciens': ('date_publication', 'id'),
+    'vues': ('-vues', '-id'),
+}
+
+TRIS_PUBLICITES = {
+    'recentes': ('-date_creation', '-id'),
+    'clics': ('-nombre_clics', '-id'),
+    'debut': ('-date_debut', '-id'),
+}
+
+
+def cle_compte_liste(auteur_id, nom, filtres=None):
+    """Clé du total en cache d'une liste de rédacteur pour une combinaison de filtres"""
+    signature = '&'.join(f'{cle}={valeur}' for cle, valeur in sorted((filtres or {}).items()) if valeur)
+    return f"nimba:listes:{auteur_id}:{version_listes(auteur_id)}:{nom}:{signature}"
+
+
+def compter_en_cache(cle, queryset):
+    """COUNT(*) d'un queryset, conservé en cache sous la clé donnée"""
+    compte = cache.get(cle)
+    if compte is None:
+        compte = queryset.count()
+        cache.set(cle, compte, DUREE_CACHE_COMPTES)
+    return compte
+
+
+class PaginateurCompteEnCache(Paginator):
+    """Paginateur dont le nombre total d'éléments est conservé en cache"""
+
+    def __init__(self, object_list, per_page, cle_compte, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cle_compte = cle_compte
+
+    @cached_property
+    def count(self):
+        return compter_en_cache(self.cle_compte, self.object_list)
+
+
+def paginer_liste(request, queryset, nom, filtres):
+    """
+    Page demandée (?page=) d'une liste de rédacteur. Le total est mis en cache
+    par rédacteur, liste et combinaison de filtres.
+    """
+    cle_compte = cle_compte_liste(request.user.id, nom, filtres)
+    paginateur = PaginateurCompteEnCache(queryset, NB_PAR_PAGE_LISTES, cle_compte)
+    return paginateur.get_page(request.GET.get('page'))
+
+
+def lire_date(valeur):
+    """Date AAAA-MM-JJ d'un filtre, ou None si absente ou invalide"""
+    try:
+        return parse_date(valeur)
+    except ValueError:
+        return None
+
+
+def debut_jour(jour):
+    """Minuit du jour dans le fuseau du site : borne comparable directement à une colonne indexée"""
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+def parametres_sans_page(request):
+    """Paramètres de la requête à conserver dans les liens de pagination"""
+    parametres = request.GET.copy()
+    parametres.pop('page', None)
+    return parametres.urlencode()
+
+
 @login_required
 @user_passes_test(is_staff_user)
 def liste_articles(request):
-    """Liste complète des articles du propriétaire"""
-    articles = Article.objects.filter(auteur=request.user).order_by('-date_publication')
+    """Liste paginée des articles du propriétaire, avec filtres et tri"""
+    filtres = {
+        'categorie': request.GET.get('categorie', ''),
+        'statut': request.GET.get('statut', ''),
+    }
+    tri = request.GET.get('tri', 'recents')
+    if tri not in TRIS_ARTICLES:
+        tri = 'recents'
+
+    # Index (auteur, date_publication) : filtre et tri par défaut sans parcours de la table
+    articles = Article.objects.filter(auteur=request.user)
+    if filtres['categorie']:
+        articles = articles.filter(categorie__nom=filtres['categorie'])
+    if filtres['statut'] == 'publie':
+        articles = articles.filter(est_publie=True)
+    elif filtres['statut'] == 'brouillon':
+        articles = articles.filter(est_publie=False, publication_programmee=False)
+    elif filtres['statut'] == 'programme':
+        articles = articles.filter(publication_programmee=True)
+    elif filtres['statut'] == 'une':
+        articles = articles.filter(est_a_la_une=True)
+    articles = articles.select_related('categorie').defer('contenu').order_by(*TRIS_ARTICLES[tri])
 
     context = {
-        'articles': articles,
+        'articles': paginer_liste(request, articles, 'articles', filtres),
+        'categories': Categorie.objects.all(),
+        'filtres': filtres,
+        'tri': tri,
+        'parametres': parametres_sans_page(request),
     }
     return render(request, 'liste_articles.html', context)
 
@@ -210,15 +505,65 @@ def liste_articles(request):
 @login_required
 @user_passes_test(is_staff_user)
 def liste_publicites(request):
-    """Liste complète des publicités du propriétaire"""
-    publicites = Publicite.objects.filter(auteur=request.user).order_by('-date_creation')
+    """Liste paginée des publicités du propriétaire, avec filtres et tri"""
+    filtres = {
+        'position': request.GET.get('position', ''),
+        'statut': request.GET.get('statut', ''),
+        'du': request.GET.get('du', ''),
+        'au': request.GET.get('au', ''),
+    }
+    tri = request.GET.get('tri', 'recentes')
+    if tri not in TRIS_PUBLICITES:
+        tri = 'recentes'
+
+    # Index (auteur, date_creation) : filtre et tri par défaut sans parcours de la table
+    publicites = Publicite.objects.filter(auteur=request.user)
+    if filtres['position']:
+        publicites = publicites.filter(position=filtres['position'])
+    now = timezone.now()
+    if filtres['statut'] == 'en_cours':
+        publicites = publicites.filter(est_active=True, date_debut__lte=now, date_fin__gte=now)
+    elif filtres['statut'] == 'planifiee':
+        publicites = publicites.filter(est_active=True, date_debut__gt=now)
+    elif filtres['statut'] == 'terminee':
+        publicites = publicites.filter(date_fin__lt=now)
+    elif filtres['statut'] == 'inactive':
+        publicites = publicites.filter(est_active=False)
+
+    # Publicités diffusées au moins en partie sur la période [du, au] : bornes
+    # en datetime plutôt que __date, qui empêcherait l'usage des index
+    du = lire_date(filtres['du'])
+    au = lire_date(filtres['au'])
+    if du:
+        publicites = publicites.filter(date_fin__gte=debut_jour(du))
+    else:
+        filtres['du'] = ''
+    if au:
+        publicites = publicites.filter(date_debut__lt=debut_jour(au + timedelta(days=1)))
+    else:
+        filtres['au'] = ''
+    publicites = publicites.order_by(*TRIS_PUBLICITES[tri])
 
     context = {
-        'publicites': publicites,
+        'publicites': paginer_liste(request, publicites, 'publicites', filtres),
+        'positions': Publicite.POSITION_CHOICES,
+        'filtres': filtres,
+        'tri': tri,
+        'parametres': parametres_sans_page(request),
     }
     return render(request, "liste_publicites.html", context)
 
 
+def lire_date_programmee(request):
+    """Date de publication programmée saisie dans le formulaire, si elle est dans le futur"""
+    valeur = parse_datetime(request.POST.get('date_programmee', ''))
+    if valeur is None:
+        return None
+    if timezone.is_naive(valeur):
+        valeur = timezone.make_aware(valeur)
+    return valeur if valeur > timezone.now() else None
+
+
 @login_required
 @user_passes_test(is_staff_user)
 def creer_article(request):
@@ -231,6 +576,8 @@ def creer_article(request):
         image = request.FILES.get('image')
         est_a_la_une = request.POST.get('est_a_la_une') == 'on'
         est_publie = request.POST.get('est_publie') == 'on'
+        date_programmee = lire_date_programmee(request)
+        programme = est_publie and date_programmee is not None
 
         if titre and contenu and categorie_id:
             categorie = get_object_or_404(Categorie, id=categorie_id)
@@ -242,17 +589,26 @@ def creer_article(request):
                 image=image,
                 auteur=request.user,
                 est_a_la_une=est_a_la_une,
-                est_publie=est_publie,
+                est_publie=est_publie and not programme,
+                publication_programmee=programme,
+                date_publication=date_programmee if programme else timezone.now(),
             )
 
             # Envoyer la newsletter si l'article est publié
-            if est_publie:
+            if programme:
+                messages.success(request,
+                                 f'✅ Article programmé pour le {timezone.localtime(date_programmee):%d/%m/%Y à %H:%M}. '
+                                 'La newsletter partira à sa publication.')
+            elif est_publie:
                 try:
                     # CORRECTION CRITIQUE: Normaliser tous les abonnés pour s'assurer que est_actif est True
                     Newsletter.objects.all().update(est_actif=True)
 
-                    nb_abonnes = envoyer_newsletter_nouvel_article(article)
-                    if nb_abonnes > 0:
+                    nb_abonnes = annoncer_article(article)
+                    if nb_abonnes is None:
+                        messages.success(request,
+                                         '✅ Article créé avec succès ! Il figurera dans le prochain envoi de la newsletter.')
+                    elif nb_abonnes > 0:
                         messages.success(request,
                                          f'✅ Article créé avec succès ! Newsletter envoyée à {nb_abonnes} abonné(s).')
                         logger.info(f"Article {article.id} créé et newsletter envoyée à {nb_abonnes} abonnés")
@@ -315,14 +671,33 @@ def logout_view(request):
     return redirect('nimbaApp:home')
 
 
-def clic_publicite(request, id):
-    """Enregistrer un clic sur une publicité"""
-    publicite = get_object_or_404(Publicite, id=id)
-    publicite.nombre_clics += 1
-    publicite.save()
+def liens_publicites():
+    """Table {id: lien} des publicités, en cache (vidée à chaque modification, voir signals.py)"""
+    liens = cache.get(CLE_LIENS_PUBLICITES)
+    if liens is None:
+        liens = dict(Publicite.objects.values_list('id', 'lien'))
+        cache.set(CLE_LIENS_PUBLICITES, liens, DUREE_CACHE_LIENS_PUBLICITES)
+    return liens
+
 
-    if publicite.lien:
-        return redirect(publicite.lien)
+def clic_publicite(request, id):
+    """
+    Enregistrer un clic sur une publicité (une fois par adresse dans le délai de
+    dédoublonnage). Au-delà de la limite de débit, le visiteur est redirigé vers
+    l'annonceur sans que le clic soit compté. La limite, le dédoublonnage et le
+    lien ne sollicitent que le cache : seul un clic compté écrit en base.
+    """
+    compter = requete_autorisee(request, 'clic_publicite') and not clic_deja_compte(request, id)
+    liens = liens_publicites()
+    if id not in liens:
+        raise Http404("Publicité introuvable")
+    if compter:
+        # UPDATE atomique, sans save() : un clic ne doit pas invalider le cache
+        # de l'emplacement ni les listes du rédacteur (signal post_save)
+        Publicite.objects.filter(id=id).update(nombre_clics=F('nombre_clics') + 1)
+
+    if liens[id]:
+        return redirect(liens[id])
     return redirect('nimbaApp:home')
 
 
@@ -351,16 +726,30 @@ def modifier_article(request, id):
         article.est_a_la_une = request.POST.get('est_a_la_une') == 'on'
         article.est_publie = request.POST.get('est_publie') == 'on'
 
+        # Programmation : seulement pour un article pas encore en ligne
+        date_programmee = lire_date_programmee(request)
+        programme = article.est_publie and not etait_publie and date_programmee is not None
+        article.publication_programmee = programme
+        if programme:
+            article.est_publie = False
+            article.date_publication = date_programmee
+
         article.save()
 
         # Envoyer la newsletter si l'article vient d'être publié
-        if article.est_publie and not etait_publie:
+        if programme:
+            messages.success(request,
+                             f'✅ Article programmé pour le {timezone.localtime(date_programmee):%d/%m/%Y à %H:%M}.')
+        elif article.est_publie and not etait_publie:
             try:
                 # CORRECTION CRITIQUE: Normaliser tous les abonnés
                 Newsletter.objects.all().update(est_actif=True)
 
-                nb_abonnes = envoyer_newsletter_nouvel_article(article)
-                if nb_abonnes > 0:
+                nb_abonnes = annoncer_article(article)
+                if nb_abonnes is None:
+                    messages.success(request,
+                                     '✅ Article modifié et publié ! Il figurera dans le prochain envoi de la newsletter.')
+                elif nb_abonnes > 0:
                     messages.success(request,
                                      f'✅ Article modifié et publié ! Newsletter envoyée à {nb_abonnes} abonné(s).')
                     logger.info(f"Article {article.id} publié et newsletter envoyée à {nb_abonnes} abonnés")